@@ -0,0 +1,313 @@
+import argparse
+import ast
+import glob
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import pandas as pd  # noqa: E402
+
+import scraper  # noqa: E402
+
+MODES = ['serial', 'concurrent', 'batch']
+EXCHANGE_TZ = 'Asia/Kolkata'
+
+
+def _literal(value):
+    if not isinstance(value, str):
+        return value
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return value
+
+
+# Datasets replayed from one committed stock_data_* directory
+class Fixture:
+    def __init__(self, directory):
+        self.directory = directory
+        self.name = os.path.basename(directory)
+
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def _exists(self, filename):
+        return os.path.exists(self._path(filename))
+
+    def _dated_frame(self, filename):
+        frame = pd.read_csv(self._path(filename), index_col=0)
+        frame.index = pd.to_datetime(frame.index, utc=True).tz_convert(EXCHANGE_TZ)
+        frame.index.name = 'Date'
+        return frame
+
+    # company_info.csv stores repr'd values; restore the Python types yfinance
+    # returns (numbers, bools, and lists/dicts such as companyOfficers)
+    def info(self):
+        if not self._exists('company_info.csv'):
+            return {}
+        values = pd.read_csv(self._path('company_info.csv'), index_col=0, dtype=str)['Value'].to_dict()
+        return {key: _literal(value) for key, value in values.items()}
+
+    def history(self):
+        if not self._exists('historical_data.csv'):
+            return pd.DataFrame()
+        return self._dated_frame('historical_data.csv')
+
+    def statement(self, filename):
+        if not self._exists(filename):
+            return pd.DataFrame()
+        frame = pd.read_csv(self._path(filename), index_col=0)
+        frame.columns = pd.to_datetime(frame.columns)
+        return frame
+
+    def table(self, filename):
+        if not self._exists(filename):
+            return None
+        return pd.read_csv(self._path(filename), index_col=0)
+
+    def series(self, filename):
+        if not self._exists(filename):
+            return pd.Series(dtype=float)
+        frame = self._dated_frame(filename)
+        return frame[frame.columns[0]]
+
+    def news(self):
+        if not self._exists('news.csv'):
+            return []
+        items = []
+        for value in pd.read_csv(self._path('news.csv'))['content']:
+            content = ast.literal_eval(value)
+            items.append({'id': content.get('id'), 'content': content})
+        return items
+
+
+# Injected latency and failures, deterministic for a given seed: each
+# (symbol, endpoint, call number) draws from its own seeded generator
+class Behaviour:
+    def __init__(self, latency_ms=50.0, jitter=0.5, error_rate=0.0, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def serve(self, symbol, endpoint):
+        with self._lock:
+            count = self._calls.get((symbol, endpoint), 0)
+            self._calls[(symbol, endpoint)] = count + 1
+        rng = random.Random(f"{self.seed}:{symbol}:{endpoint}:{count}")
+        time.sleep(self.latency_ms / 1000 * rng.uniform(1 - self.jitter, 1 + self.jitter))
+        if rng.random() < self.error_rate:
+            raise ConnectionError(f"Injected failure for {symbol} {endpoint}")
+
+
+# Stand-in for yf.Ticker. Endpoints are properties (and history() a method),
+# like the real class, so TickerClient treats them the same way.
+class FakeTicker:
+    def __init__(self, symbol, fixture, behaviour):
+        self.ticker = symbol
+        self._fixture = fixture
+        self._behaviour = behaviour
+
+    def _serve(self, endpoint, load):
+        self._behaviour.serve(self.ticker, endpoint)
+        return load()
+
+    @property
+    def info(self):
+        return self._serve('info', self._fixture.info)
+
+    def history(self, period="max", start=None, **kwargs):
+        hist = self._serve('history', self._fixture.history)
+        if start is not None and not hist.empty:
+            hist = hist[hist.index >= pd.Timestamp(start, tz=hist.index.tz)]
+        return hist
+
+    @property
+    def income_stmt(self):
+        return self._serve('income_stmt', lambda: self._fixture.statement('income_statement.csv'))
+
+    @property
+    def balance_sheet(self):
+        return self._serve('balance_sheet', lambda: self._fixture.statement('balance_sheet.csv'))
+
+    @property
+    def cashflow(self):
+        return self._serve('cashflow', lambda: self._fixture.statement('cash_flow.csv'))
+
+    @property
+    def quarterly_income_stmt(self):
+        return self._serve('quarterly_income_stmt',
+                           lambda: self._fixture.statement('quarterly_income_statement.csv'))
+
+    @property
+    def quarterly_balance_sheet(self):
+        return self._serve('quarterly_balance_sheet', lambda: self._fixture.statement('quarterly_balance_sheet.csv'))
+
+    @property
+    def quarterly_cashflow(self):
+        return self._serve('quarterly_cashflow', lambda: self._fixture.statement('quarterly_cash_flow.csv'))
+
+    @property
+    def major_holders(self):
+        return self._serve('major_holders', lambda: self._fixture.table('major_holders.csv'))
+
+    @property
+    def recommendations(self):
+        return self._serve('recommendations', lambda: self._fixture.table('recommendations.csv'))
+
+    @property
+    def sustainability(self):
+        return self._serve('sustainability', lambda: self._fixture.table('esg_data.csv'))
+
+    @property
+    def news(self):
+        return self._serve('news', self._fixture.news)
+
+    @property
+    def actions(self):
+        return self._serve('actions', lambda: self._fixture.table('actions.csv'))
+
+    @property
+    def dividends(self):
+        return self._serve('dividends', lambda: self._fixture.series('dividends.csv'))
+
+    @property
+    def splits(self):
+        return self._serve('splits', lambda: self._fixture.series('splits.csv'))
+
+
+# Stand-in for the yfinance module: BENCHn.NS symbols map onto the committed
+# fixtures round-robin. download() serves a whole chunk for one latency draw.
+class FakeYFinance:
+    def __init__(self, fixtures, behaviour):
+        self._fixtures = fixtures
+        self._behaviour = behaviour
+
+    def fixture_for(self, symbol):
+        digits = ''.join(c for c in symbol if c.isdigit())
+        return self._fixtures[int(digits or 0) % len(self._fixtures)]
+
+    def Ticker(self, symbol):
+        return FakeTicker(symbol, self.fixture_for(symbol), self._behaviour)
+
+    def download(self, symbols, group_by="ticker", **kwargs):
+        self._behaviour.serve(",".join(symbols), 'download')
+        frames = {symbol: self.fixture_for(symbol).history() for symbol in symbols}
+        return pd.concat(frames, axis=1)
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def run_mode(mode, tickers, workers):
+    symbols = [f"BENCH{i}.NS" for i in range(tickers)]
+    latencies = []
+    start = time.perf_counter()
+    if mode == 'batch':
+        results = scraper.run_batch(symbols, retry_count=3, delay=0.01, max_workers=workers,
+                                    section_workers=workers, host_concurrency=None)
+        latencies = list(results['elapsed_s'])
+        succeeded = int(results['success'].sum())
+    else:
+        section_workers = workers if mode == 'concurrent' else 1
+        succeeded = 0
+        for symbol in symbols:
+            ticker_start = time.perf_counter()
+            success, _, _ = scraper.get_stock_data(symbol, symbol, retry_count=3, delay=0.01,
+                                                   max_workers=section_workers)
+            latencies.append(time.perf_counter() - ticker_start)
+            succeeded += bool(success)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == 'darwin' else peak_rss / 1024
+    return {
+        'mode': mode,
+        'tickers': tickers,
+        'succeeded': succeeded,
+        'elapsed_s': round(elapsed, 3),
+        'tickers_per_min': round(tickers / elapsed * 60, 1) if elapsed else None,
+        'p50_s': round(percentile(latencies, 50), 3),
+        'p95_s': round(percentile(latencies, 95), 3),
+        'p99_s': round(percentile(latencies, 99), 3),
+        'peak_rss_mb': round(peak_rss_mb, 1),
+    }
+
+
+def load_fixtures():
+    fixtures = [Fixture(d) for d in sorted(glob.glob(os.path.join(REPO_ROOT, 'stock_data_*'))) if os.path.isdir(d)]
+    if not fixtures:
+        raise SystemExit("No stock_data_* fixtures found")
+    return fixtures
+
+
+# Run one mode in this process against the fake yfinance, inside a scratch
+# working directory so the committed fixtures are never overwritten
+def run_single(args):
+    fixtures = load_fixtures()
+    behaviour = Behaviour(latency_ms=args.latency_ms, jitter=args.jitter, error_rate=args.error_rate,
+                          seed=args.seed)
+    scraper.yf = FakeYFinance(fixtures, behaviour)
+    scraper.configure_rate_limit(rate=1e9, burst=10 ** 9)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        return run_mode(args.mode, args.tickers, args.workers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scraping modes offline against replayed fixtures.")
+    parser.add_argument("--mode", choices=MODES, help="Run a single mode in-process (default: all, one process each)")
+    parser.add_argument("-n", "--tickers", type=int, default=20, help="Tickers per mode (default: 20)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrency for concurrent/batch modes (default: 8)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Mean injected latency per request")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Latency jitter as a fraction of the mean")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability a request fails transiently")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.mode:
+        results = [run_single(args)]
+    else:
+        # Each mode gets a fresh process so peak RSS is measured per mode
+        results = []
+        passthrough = [f"--tickers={args.tickers}", f"--workers={args.workers}", f"--latency-ms={args.latency_ms}",
+                       f"--jitter={args.jitter}", f"--error-rate={args.error_rate}", f"--seed={args.seed}", "--json"]
+        for mode in MODES:
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), f"--mode={mode}"] + passthrough,
+                                  capture_output=True, text=True)
+            if proc.returncode != 0:
+                raise SystemExit(f"{mode} mode failed:\n{proc.stderr}")
+            results.extend(json.loads(proc.stdout))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'mode':<12}{'tickers':>8}{'ok':>5}{'elapsed s':>11}{'tickers/min':>13}"
+          f"{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'peak RSS MB':>13}")
+    for r in results:
+        print(f"{r['mode']:<12}{r['tickers']:>8}{r['succeeded']:>5}{r['elapsed_s']:>11}{r['tickers_per_min']:>13}"
+              f"{r['p50_s']:>9}{r['p95_s']:>9}{r['p99_s']:>9}{r['peak_rss_mb']:>13}")
+
+
+if __name__ == "__main__":
+    main()
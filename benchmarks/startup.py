@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry points to time. Each snippet runs in a fresh interpreter; the time
+# reported is from just before the first import until the snippet finishes.
+ENTRY_POINTS = {
+    "scraper (core import)": "import scraper",
+    "get_indian_tickers": "import scraper; scraper.get_indian_tickers('TCS')",
+    "save_data (text)": (
+        "import logging, tempfile, scraper\n"
+        "with tempfile.TemporaryDirectory() as d:\n"
+        "    scraper.save_data('report', 'summary_report.txt', d, logging.getLogger('bench'))"
+    ),
+    "scrape_cli": "import scrape_cli",
+    "get_stock_data dependencies": "import scraper; scraper.pd.DataFrame; scraper.yf.Ticker",
+    "streamlit UI": "import scraper, streamlit",
+}
+
+HEAVY_MODULES = ["pandas", "yfinance", "streamlit"]
+
+TEMPLATE = """
+import sys, time, json
+start = time.perf_counter()
+{snippet}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_entry_point(snippet, runs):
+    code = TEMPLATE.format(snippet=snippet, heavy=HEAVY_MODULES)
+    samples = []
+    loaded = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+            return None, [], error
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        samples.append(result["elapsed"])
+        loaded = result["loaded"]
+    return samples, loaded, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report cold-start import time per entry point.")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="Fresh interpreters per entry point (default: 5)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    report = []
+    for name, snippet in ENTRY_POINTS.items():
+        samples, loaded, error = time_entry_point(snippet, args.runs)
+        row = {"entry_point": name, "heavy_modules_loaded": loaded}
+        if error:
+            row["error"] = error
+        else:
+            row["min_ms"] = round(min(samples) * 1000, 1)
+            row["median_ms"] = round(statistics.median(samples) * 1000, 1)
+        report.append(row)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'entry point':<30} {'min ms':>9} {'median ms':>10}  heavy modules loaded")
+    for row in report:
+        if "error" in row:
+            print(f"{row['entry_point']:<30} {'-':>9} {'-':>10}  unavailable: {row['error']}")
+        else:
+            loaded = ", ".join(row["heavy_modules_loaded"]) or "none"
+            print(f"{row['entry_point']:<30} {row['min_ms']:>9} {row['median_ms']:>10}  {loaded}")
+
+
+if __name__ == "__main__":
+    main()
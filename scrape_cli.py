@@ -0,0 +1,98 @@
+import argparse
+import logging
+import sys
+
+from scraper import STORAGE_BACKENDS, ResponseCache, expand_tickers, load_watchlist, metrics, run_batch
+
+
+# Command line arguments
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Scrape stock data for a list of tickers without starting the Streamlit app.")
+    parser.add_argument("tickers", nargs="*",
+                        help="Ticker symbols or company names (e.g. TCS, INFY.NS). Bare names get the .NS suffix.")
+    parser.add_argument("-w", "--watchlist", action="append", default=[],
+                        help="Watchlist file with one ticker per line; may be given more than once")
+    parser.add_argument("--workers", type=int, default=4, help="Tickers scraped in parallel (default: 4)")
+    parser.add_argument("--section-workers", type=int, default=1,
+                        help="Datasets fetched in parallel per ticker (default: 1)")
+    parser.add_argument("--host-concurrency", type=int, default=8,
+                        help="Maximum in-flight requests to Yahoo (default: 8)")
+    parser.add_argument("--rate", type=float, default=None, help="Requests per second (default: 2)")
+    parser.add_argument("--burst", type=int, default=None, help="Rate limiter burst size (default: 5)")
+    parser.add_argument("--retry-count", type=int, default=3, help="Attempts per request (default: 3)")
+    parser.add_argument("--delay", type=float, default=2, help="Base retry backoff in seconds (default: 2)")
+    parser.add_argument("--storage", choices=sorted(STORAGE_BACKENDS), default="csv",
+                        help="Storage format for datasets (default: csv)")
+    parser.add_argument("--cache", action="store_true", help="Serve repeat requests from the on-disk cache")
+    parser.add_argument("--cache-dir", default=".scraper_cache", help="Response cache directory")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch history bars newer than those already on disk")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip datasets completed within their freshness window")
+    parser.add_argument("--fsync", action="store_true",
+                        help="Sync files to disk before they replace the old versions")
+    parser.add_argument("--no-bulk-history", action="store_true",
+                        help="Fetch history per ticker instead of in bulk")
+    parser.add_argument("--history-chunk-size", type=int, default=50,
+                        help="Symbols per bulk history request (default: 50)")
+    parser.add_argument("-o", "--output", help="Write the per-ticker result table to this CSV file")
+    parser.add_argument("--report", help="Write per-dataset timings aggregated across tickers to this JSON file")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this local port while running")
+    parser.add_argument("--metrics-file", help="Write Prometheus metrics to this file when the batch finishes")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only log warnings and errors")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    names = list(args.tickers)
+    for path in args.watchlist:
+        names.extend(load_watchlist(path))
+    tickers = expand_tickers(names)
+    if not tickers:
+        print("No tickers given; pass symbols or --watchlist FILE", file=sys.stderr)
+        return 2
+
+    # Log to stderr instead of the in-memory buffer used by the UI
+    logger = logging.getLogger("stock_scraper_cli")
+    logger.setLevel(logging.WARNING if args.quiet else logging.INFO)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s'))
+        logger.addHandler(handler)
+
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+
+    results = run_batch(
+        tickers,
+        retry_count=args.retry_count,
+        delay=args.delay,
+        max_workers=args.workers,
+        section_workers=args.section_workers,
+        host_concurrency=args.host_concurrency,
+        logger=logger,
+        bulk_history=not args.no_bulk_history,
+        history_chunk_size=args.history_chunk_size,
+        cache=ResponseCache(args.cache_dir) if args.cache else None,
+        rate=args.rate,
+        burst=args.burst,
+        resume=args.resume,
+        storage=args.storage,
+        incremental=args.incremental,
+        report_path=args.report,
+        fsync=args.fsync,
+    )
+
+    if args.metrics_file:
+        metrics.write(args.metrics_file)
+    if args.output:
+        results.to_csv(args.output, index=False)
+    print(results.to_string(index=False))
+    return 0 if results['success'].all() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+import argparse
+import heapq
+import itertools
+import logging
+import signal
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dtime, timedelta, timezone
+
+from scraper import (DATASET_SECTIONS, STORAGE_BACKENDS, configure_rate_limit, expand_tickers, get_stock_data,
+                     load_manifest, load_watchlist, metrics, output_directory_name, set_host_concurrency)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+MARKET_CLOSE = dtime(15, 30)
+
+
+# Cadences: each maps the time of the last fetch to the time the dataset is
+# next due. All datetimes are timezone-aware.
+def every(seconds):
+    def cadence(last):
+        return last + timedelta(seconds=seconds)
+    return cadence
+
+
+# Next weekday at `at` (exchange local time) after the last fetch
+def weekdays_at(at, tz=IST):
+    def cadence(last):
+        local = last.astimezone(tz)
+        due = datetime.combine(local.date(), at, tzinfo=tz)
+        if due <= local:
+            due += timedelta(days=1)
+        while due.weekday() >= 5:
+            due += timedelta(days=1)
+        return due
+    return cadence
+
+
+# Shortly after the NSE close, once the day's bar is final
+after_market_close = weekdays_at(dtime(16, 0))
+
+DEFAULT_CADENCES = {
+    'info': after_market_close,
+    'history': after_market_close,
+    'income_stmt': every(7 * 24 * 3600),
+    'balance_sheet': every(7 * 24 * 3600),
+    'cashflow': every(7 * 24 * 3600),
+    'quarterly_income_stmt': every(7 * 24 * 3600),
+    'quarterly_balance_sheet': every(7 * 24 * 3600),
+    'quarterly_cashflow': every(7 * 24 * 3600),
+    'major_holders': every(7 * 24 * 3600),
+    'recommendations': every(24 * 3600),
+    'sustainability': every(7 * 24 * 3600),
+    'news': every(3600),
+    'actions': after_market_close,
+    'dividends': after_market_close,
+    'splits': after_market_close,
+}
+
+# How long to wait before retrying a dataset whose last fetch failed. The
+# wait doubles with every consecutive failure, up to MAX_RETRY_BACKOFF.
+RETRY_FAILED_AFTER = timedelta(minutes=15)
+MAX_RETRY_BACKOFF = timedelta(hours=6)
+
+
+# Long-running scheduler. Every (ticker, dataset) pair sits in a heap ordered
+# by its next due time; due pairs are grouped per ticker and refreshed with
+# one get_stock_data call restricted to those datasets.
+class RefreshScheduler:
+    def __init__(self, symbols, cadences=None, workers=2, logger=None, metrics_file=None, **scrape_options):
+        self.symbols = symbols
+        self.metrics_file = metrics_file
+        self.cadences = dict(DEFAULT_CADENCES, **(cadences or {}))
+        self.workers = workers
+        self.logger = logger or logging.getLogger("stock_scraper_daemon")
+        self.scrape_options = scrape_options
+        self._queue = []
+        self._counter = itertools.count()
+        self._failures = {}
+        self._stop = threading.Event()
+
+    def _push(self, due, symbol, dataset):
+        heapq.heappush(self._queue, (due, next(self._counter), symbol, dataset))
+
+    # Seed the queue from the manifests on disk so a restart only refreshes
+    # what is actually stale
+    def _seed(self, now):
+        for symbol in self.symbols:
+            datasets = load_manifest(output_directory_name(symbol))['datasets']
+            for section in DATASET_SECTIONS:
+                self._push(self._next_due(datasets.get(section.key), section.key, now), symbol, section.key)
+
+    def _next_due(self, entry, dataset, now):
+        if not entry or 'fetched_at' not in entry:
+            return now
+        fetched_at = datetime.fromisoformat(entry['fetched_at'])
+        if entry.get('status') == 'failed':
+            return fetched_at + RETRY_FAILED_AFTER
+        return self.cadences[dataset](fetched_at)
+
+    def _retry_after(self, failures):
+        return min(RETRY_FAILED_AFTER * 2 ** (failures - 1), MAX_RETRY_BACKOFF)
+
+    # Next due time after a refresh. A refresh that failed, or left no new
+    # manifest entry behind (e.g. ticker validation failed or was throttled),
+    # backs off instead of being retried straight away.
+    def _reschedule(self, symbol, dataset, before, entry, now):
+        key = (symbol, dataset)
+        recorded = entry and entry.get('fetched_at') and entry.get('fetched_at') != (before or {}).get('fetched_at')
+        if recorded and entry.get('status') != 'failed':
+            self._failures.pop(key, None)
+            next_due = self._next_due(entry, dataset, now)
+        else:
+            self._failures[key] = self._failures.get(key, 0) + 1
+            next_due = now + self._retry_after(self._failures[key])
+        # Never reschedule into the past, or a dataset whose manifest entry
+        # is already stale would be refreshed in a loop
+        return max(next_due, now + timedelta(seconds=60))
+
+    def _pop_due(self, now):
+        due = {}
+        while self._queue and self._queue[0][0] <= now:
+            _, _, symbol, dataset = heapq.heappop(self._queue)
+            due.setdefault(symbol, []).append(dataset)
+        return due
+
+    def _refresh(self, symbol, dataset_keys):
+        self.logger.info(f"Refreshing {symbol}: {', '.join(dataset_keys)}")
+        ticker_logger = self.logger.getChild(symbol.replace('.', '_'))
+        try:
+            get_stock_data(symbol, symbol, logger=ticker_logger, dataset_keys=dataset_keys, **self.scrape_options)
+        except Exception as e:
+            self.logger.error(f"Unhandled error while refreshing {symbol}: {str(e)}")
+
+    def stop(self, *args):
+        self._stop.set()
+
+    # Run until stop() is called. With once=True, return as soon as nothing
+    # is due any more instead of sleeping until the next due time.
+    def run(self, once=False):
+        self._seed(datetime.now(timezone.utc))
+        self.logger.info(f"Scheduling {len(self._queue)} datasets for {len(self.symbols)} tickers")
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            while not self._stop.is_set() and self._queue:
+                now = datetime.now(timezone.utc)
+                due = self._pop_due(now)
+                if not due:
+                    if once:
+                        break
+                    wait = (self._queue[0][0] - now).total_seconds()
+                    self.logger.info(f"Next refresh due in {wait:.0f}s")
+                    self._stop.wait(max(wait, 0))
+                    continue
+
+                before = {symbol: load_manifest(output_directory_name(symbol))['datasets'] for symbol in due}
+                list(executor.map(lambda item: self._refresh(*item), due.items()))
+                if self.metrics_file:
+                    metrics.write(self.metrics_file)
+
+                now = datetime.now(timezone.utc)
+                for symbol, dataset_keys in due.items():
+                    datasets = load_manifest(output_directory_name(symbol))['datasets']
+                    for dataset in dataset_keys:
+                        next_due = self._reschedule(symbol, dataset, before[symbol].get(dataset),
+                                                    datasets.get(dataset), now)
+                        self._push(next_due, symbol, dataset)
+
+        self.logger.info("Scheduler stopped")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep watched tickers fresh, refreshing each dataset on its cadence.")
+    parser.add_argument("tickers", nargs="*", help="Ticker symbols or company names")
+    parser.add_argument("-w", "--watchlist", action="append", default=[], help="Watchlist file (repeatable)")
+    parser.add_argument("--workers", type=int, default=2, help="Tickers refreshed in parallel (default: 2)")
+    parser.add_argument("--section-workers", type=int, default=1, help="Datasets fetched in parallel per ticker")
+    parser.add_argument("--host-concurrency", type=int, default=8, help="Maximum in-flight requests to Yahoo")
+    parser.add_argument("--rate", type=float, default=None, help="Requests per second (default: 2)")
+    parser.add_argument("--burst", type=int, default=None, help="Rate limiter burst size (default: 5)")
+    parser.add_argument("--storage", choices=sorted(STORAGE_BACKENDS), default="csv")
+    parser.add_argument("--fsync", action="store_true", help="Sync files to disk before they replace the old versions")
+    parser.add_argument("--once", action="store_true", help="Refresh whatever is due now, then exit")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this local port")
+    parser.add_argument("--metrics-file", help="Rewrite Prometheus metrics to this file after every refresh round")
+    args = parser.parse_args(argv)
+
+    names = list(args.tickers)
+    for path in args.watchlist:
+        names.extend(load_watchlist(path))
+    symbols = expand_tickers(names)
+    if not symbols:
+        print("No tickers given; pass symbols or --watchlist FILE", file=sys.stderr)
+        return 2
+
+    logger = logging.getLogger("stock_scraper_daemon")
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s'))
+        logger.addHandler(handler)
+
+    set_host_concurrency(args.host_concurrency)
+    configure_rate_limit(rate=args.rate, burst=args.burst)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+
+    # History is refreshed incrementally; the first run per ticker still
+    # downloads the full series. No response cache: a scheduled refresh must
+    # reach Yahoo, and cache TTLs can be as long as a dataset's cadence.
+    scheduler = RefreshScheduler(symbols, workers=args.workers, logger=logger, metrics_file=args.metrics_file,
+                                 max_workers=args.section_workers, storage=args.storage, incremental=True,
+                                 fsync=args.fsync)
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    signal.signal(signal.SIGINT, scheduler.stop)
+    scheduler.run(once=args.once)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,44 @@
-import streamlit as st
-import pandas as pd
+import importlib
 import time
 import os
-import base64
 import threading
 import sys
 import io
-from contextlib import redirect_stdout, redirect_stderr
-import yfinance as yf
+import ast
+import sqlite3
+import json
+import hashlib
+import itertools
+import random
+import pickle
+import re
+from contextlib import ExitStack, closing, contextmanager, redirect_stdout, redirect_stderr
 import logging
-from datetime import datetime
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
 
-# Set page configuration
-st.set_page_config(
-    page_title="Stock Data Scraper",
-    page_icon="📊",
-    layout="wide"
-)
+
+# Stands in for a heavy module and imports it on first attribute access, so
+# importing this module (e.g. for get_indian_tickers or save_data of plain
+# text) does not pay for pandas and yfinance
+class _LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+pd = _LazyModule("pandas")
+yf = _LazyModule("yfinance")
 
 # Function to capture stdout/stderr
 class OutputCapture:
@@ -38,44 +60,625 @@ class OutputCapture:
         return self.output.getvalue()
 
 
-# Setup logging to a string buffer
-def setup_logging(ticker_name):
-    log_handler = logging.StreamHandler(io.StringIO())
-    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    log_handler.setFormatter(log_formatter)
+# Log handler keeping the most recent formatted lines in a bounded ring
+# buffer. Every line gets a sequence number so readers can poll for new lines
+# with a cursor while a scrape is still running.
+class RingBufferHandler(logging.Handler):
+    def __init__(self, capacity=5000):
+        super().__init__()
+        self._lines = deque(maxlen=capacity)
+        self._next_seq = 0
+        self._buffer_lock = threading.Lock()
 
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._buffer_lock:
+            self._lines.append((self._next_seq, line))
+            self._next_seq += 1
+
+    # Returns the lines logged since `cursor` and the cursor for the next
+    # read. Lines that already fell out of the buffer are skipped.
+    def read(self, cursor=0):
+        with self._buffer_lock:
+            lines = [line for seq, line in self._lines if seq >= cursor]
+            return lines, self._next_seq
+
+    def getvalue(self):
+        with self._buffer_lock:
+            return "\n".join(line for _, line in self._lines) + ("\n" if self._lines else "")
+
+
+def _get_logger(ticker_name):
     logger = logging.getLogger(f"stock_scraper_{ticker_name}")
     logger.setLevel(logging.INFO)
-    logger.addHandler(log_handler)
+    return logger
+
+
+def _new_log_handler():
+    log_handler = RingBufferHandler()
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    log_handler.setFormatter(log_formatter)
+    return log_handler
+
+
+# Buffers of recently finished runs, oldest dropped first
+MAX_RETAINED_LOG_BUFFERS = 20
+_retained_log_buffers = OrderedDict()
+_log_registry_lock = threading.Lock()
+
+
+def _retain_log_buffer(run_name, log_handler):
+    with _log_registry_lock:
+        _retained_log_buffers[run_name] = log_handler
+        _retained_log_buffers.move_to_end(run_name)
+        while len(_retained_log_buffers) > MAX_RETAINED_LOG_BUFFERS:
+            _retained_log_buffers.popitem(last=False)
+
+
+def recent_log_buffers():
+    with _log_registry_lock:
+        return list(_retained_log_buffers.items())
+
 
+# Setup logging to a ring buffer. Idempotent: the logger for a name keeps a
+# single buffer handler no matter how often this is called.
+def setup_logging(ticker_name):
+    logger = _get_logger(ticker_name)
+    with _log_registry_lock:
+        for handler in logger.handlers:
+            if isinstance(handler, RingBufferHandler):
+                return logger, handler
+        log_handler = _new_log_handler()
+        logger.addHandler(log_handler)
     return logger, log_handler
 
+
+# Per-run logging: attaches a fresh buffer handler for the duration of the
+# block, then detaches and closes it and keeps its buffer in the capped
+# registry of recent runs
+@contextmanager
+def logging_scope(ticker_name):
+    logger = _get_logger(ticker_name)
+    log_handler = _new_log_handler()
+    logger.addHandler(log_handler)
+    started = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    try:
+        yield logger, log_handler
+    finally:
+        logger.removeHandler(log_handler)
+        log_handler.close()
+        _retain_log_buffer(f"{ticker_name} @ {started}", log_handler)
+
+
+# Metrics in the Prometheus text format. Values are spread over a fixed
+# number of shards, each a dict with its own lock. Threads are assigned a
+# shard round-robin the first time they record anything (thread ids are
+# aligned addresses, so `ident % SHARDS` would put every thread on one
+# shard); the hot path only contends with threads sharing its shard, and the
+# number of shards stays constant however many threads come and go.
+# Collecting sums a snapshot of each shard.
+class _ShardedMetric:
+    kind = None
+    SHARDS = 16
+    _thread_slot = threading.local()
+    _next_slot = itertools.count()
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._shards = [({}, threading.Lock()) for _ in range(self.SHARDS)]
+
+    def _shard(self):
+        slot = getattr(_ShardedMetric._thread_slot, 'index', None)
+        if slot is None:
+            # next() on itertools.count is atomic under the GIL
+            slot = _ShardedMetric._thread_slot.index = next(_ShardedMetric._next_slot)
+        return self._shards[slot % self.SHARDS]
+
+    def _snapshots(self):
+        snapshots = []
+        for values, lock in self._shards:
+            with lock:
+                snapshots.append({labels: list(v) if isinstance(v, list) else v for labels, v in values.items()})
+        return snapshots
+
+    def _labels(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Counter(_ShardedMetric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        values, lock = self._shard()
+        with lock:
+            values[labels] = values.get(labels, 0) + amount
+
+    def collect(self):
+        totals = {}
+        for shard in self._snapshots():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return [f"{self.name}{self._labels(labels)} {value}" for labels, value in sorted(totals.items())]
+
+
+class Histogram(_ShardedMetric):
+    kind = 'histogram'
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    # Per label set: one count per bucket (not cumulative), then sum and count
+    def observe(self, value, *labels):
+        bucket = next((i for i, bound in enumerate(self.buckets) if value <= bound), None)
+        values, lock = self._shard()
+        with lock:
+            state = values.get(labels)
+            if state is None:
+                state = values[labels] = [0] * (len(self.buckets) + 2)
+            if bucket is not None:
+                state[bucket] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def collect(self):
+        totals = {}
+        for shard in self._snapshots():
+            for labels, state in shard.items():
+                total = totals.setdefault(labels, [0] * len(state))
+                for i, value in enumerate(state):
+                    total[i] += value
+        lines = []
+        for labels, state in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._labels(labels, [('le', repr(float(bound)))])} {cumulative}")
+            lines.append(f"{self.name}_bucket{self._labels(labels, [('le', '+Inf')])} {state[-1]}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {state[-2]}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {state[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def exposition(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+    # Dump the current values to a file, replacing it atomically so a
+    # node_exporter textfile collector never reads a partial file
+    def write(self, path):
+        _atomic_write(path, _write_text(self.exposition()))
+
+    # Serve the exposition at http://host:port/metrics from a daemon thread.
+    # Returns the server; call shutdown() on it to stop.
+    def serve(self, port, host="127.0.0.1"):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.exposition().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+metrics = MetricsRegistry()
+upstream_requests = metrics.counter(
+    'scraper_upstream_requests_total', 'Requests made to Yahoo Finance by endpoint and status class',
+    ['endpoint', 'status'])
+upstream_request_seconds = metrics.histogram(
+    'scraper_upstream_request_seconds', 'Latency of requests to Yahoo Finance', ['endpoint'])
+upstream_retries = metrics.counter('scraper_retries_total', 'Retried upstream requests by endpoint', ['endpoint'])
+cache_lookups = metrics.counter(
+    'scraper_cache_lookups_total', 'Response cache lookups by endpoint and result', ['endpoint', 'result'])
+cache_evictions = metrics.counter('scraper_cache_evictions_total', 'Response cache entries evicted')
+dataset_fetch_seconds = metrics.histogram(
+    'scraper_dataset_fetch_seconds', 'Time to fetch a dataset, including waits and retries', ['dataset', 'outcome'])
+files_written = metrics.counter('scraper_files_written_total', 'Files written by save_data', ['format'])
+bytes_written = metrics.counter('scraper_bytes_written_total', 'Bytes written by save_data', ['format'])
+files_unchanged = metrics.counter(
+    'scraper_files_unchanged_total', 'Datasets not rewritten because their content was unchanged', ['dataset'])
+
+
+# HTTP status of a failed request: from the response attached to the error
+# (requests and curl_cffi HTTPError) or from an explicit "HTTP Error 503" /
+# "status code 503" in the message; None when the error names no status
+_HTTP_STATUS_PATTERN = re.compile(r'\b(?:HTTP(?: Error)?|status(?: code)?)[\s:=]*([1-5]\d\d)\b', re.IGNORECASE)
+
+
+def _http_status(error):
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if isinstance(status, int):
+        return status
+    match = _HTTP_STATUS_PATTERN.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+# Network failures: the builtin exceptions plus requests/curl_cffi ones,
+# which derive from IOError rather than ConnectionError/TimeoutError
+_NETWORK_ERROR_NAMES = {'ConnectionError', 'ConnectTimeout', 'ReadTimeout', 'Timeout', 'TimeoutError',
+                        'ChunkedEncodingError', 'ProxyError', 'SSLError'}
+
+
+def _is_network_error(error):
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in _NETWORK_ERROR_NAMES for cls in type(error).__mro__)
+
+
+# Status class of an upstream request for the requests counter: '2xx' on
+# success, the HTTP class when the error carries a status code, otherwise
+# 'network' or 'error'
+def _status_class(error=None):
+    if error is None:
+        return '2xx'
+    if _is_rate_limited(error):
+        return '4xx'
+    status = _http_status(error)
+    if status is not None:
+        return f"{status // 100}xx"
+    if _is_network_error(error):
+        return 'network'
+    return 'error'
+
+def output_directory_name(ticker_symbol):
+    return f"stock_data_{ticker_symbol.replace('.', '_')}"
+
+
 # Create output directory
 def create_output_directory(ticker_symbol):
-    output_dir = f"stock_data_{ticker_symbol.replace('.', '_')}"
+    output_dir = output_directory_name(ticker_symbol)
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     return output_dir
 
-# Save data function
-def save_data(data, filename, output_dir, logger):
+# Storage backends for tabular datasets. Section filenames are written with a
+# .csv extension; a backend swaps in its own extension, and readers pick the
+# backend from the extension of the file that is present.
+class CsvStorage:
+    name = 'csv'
+    extension = '.csv'
+
+    def write(self, frame, filepath):
+        frame.to_csv(filepath, index=True)
+
+    def read(self, filepath):
+        return pd.read_csv(filepath)
+
+
+class ParquetStorage:
+    name = 'parquet'
+    extension = '.parquet'
+
+    def __init__(self, compression='zstd'):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Parquet storage requires pyarrow (pip install pyarrow)")
+        self.compression = compression
+
+    # Parquet needs string column labels and a single type per column, so
+    # statement date columns are labelled as text and mixed object columns
+    # (e.g. company info values) are stored as strings
+    @staticmethod
+    def _prepare(frame):
+        frame = frame.copy()
+        frame.columns = [str(c) for c in frame.columns]
+        for column in frame.columns:
+            if frame[column].dtype == object:
+                frame[column] = frame[column].map(lambda v: v if v is None or isinstance(v, str) else str(v))
+        return frame
+
+    def write(self, frame, filepath):
+        self._prepare(frame).to_parquet(filepath, compression=self.compression, index=True)
+
+    def read(self, filepath):
+        return pd.read_parquet(filepath)
+
+
+# Embedded database backend: every dataset of a ticker (or of a whole batch,
+# when `path` is given) goes into one SQLite file, one table per dataset type
+# with rows keyed by symbol and index value, written in a single transaction.
+# Statements are stored transposed so that each row is one reporting date.
+class SqliteStorage:
+    name = 'sqlite'
+    extension = '.sqlite'
+    transactional = True
+    STATEMENT_TABLES = {'income_statement', 'balance_sheet', 'cash_flow', 'quarterly_income_statement',
+                        'quarterly_balance_sheet', 'quarterly_cash_flow'}
+
+    def __init__(self, path=None):
+        self.path = path
+
+    def database_path(self, output_dir):
+        return self.path or os.path.join(output_dir, 'datasets' + self.extension)
+
+    @staticmethod
+    def _quote(name):
+        return '"' + str(name).replace('"', '""') + '"'
+
+    @staticmethod
+    def _value(value):
+        if value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+            return None
+        if isinstance(value, (str, int, float, bytes)):
+            return value
+        if isinstance(value, datetime):
+            return str(value)
+        if hasattr(value, 'item'):
+            # numpy scalars
+            try:
+                return SqliteStorage._value(value.item())
+            except (ValueError, TypeError):
+                pass
+        return str(value)
+
+    def _ensure_table(self, conn, table, index_column, columns):
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {self._quote(table)} '
+                     f'(symbol TEXT NOT NULL, {self._quote(index_column)})')
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_info({self._quote(table)})')}
+        for column in [index_column] + columns:
+            if column not in existing:
+                conn.execute(f'ALTER TABLE {self._quote(table)} ADD COLUMN {self._quote(column)}')
+                existing.add(column)
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {self._quote(table + "_symbol_key")} '
+                     f'ON {self._quote(table)} (symbol, {self._quote(index_column)})')
+
+    # Replace the rows of `symbol` in every given table in one transaction.
+    # `tables` is a list of (table name, DataFrame) pairs.
+    def write_all(self, db_path, symbol, tables):
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for table, frame in tables:
+                if table in self.STATEMENT_TABLES:
+                    frame = frame.T
+                    frame.index.name = 'date'
+                index_column = str(frame.index.name or 'key')
+                columns = [str(c) for c in frame.columns]
+                self._ensure_table(conn, table, index_column, columns)
+
+                conn.execute(f'DELETE FROM {self._quote(table)} WHERE symbol = ?', (symbol,))
+                names = ', '.join(self._quote(c) for c in ['symbol', index_column] + columns)
+                placeholders = ', '.join('?' for _ in range(len(columns) + 2))
+                rows = [(symbol, self._value(key)) + tuple(self._value(v) for v in values)
+                        for key, values in zip(frame.index, frame.itertuples(index=False, name=None))]
+                conn.executemany(f'INSERT INTO {self._quote(table)} ({names}) VALUES ({placeholders})', rows)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def list_tables(db_path):
+        with closing(sqlite3.connect(db_path)) as conn:
+            return [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+
+    # Read one table, optionally limited to one symbol. Columns that only
+    # exist for other symbols are dropped.
+    def read_table(self, db_path, table, symbol=None):
+        query = f'SELECT * FROM {self._quote(table)}'
+        params = ()
+        if symbol is not None:
+            query += ' WHERE symbol = ?'
+            params = (symbol,)
+        with closing(sqlite3.connect(db_path)) as conn:
+            frame = pd.read_sql_query(query, conn, params=params)
+        return frame.dropna(axis=1, how='all')
+
+
+# Backends that write one file per dataset
+FILE_BACKENDS = {'csv': CsvStorage, 'parquet': ParquetStorage}
+STORAGE_BACKENDS = dict(FILE_BACKENDS, sqlite=SqliteStorage)
+
+
+def get_storage(storage=None):
+    if storage is None:
+        return CsvStorage()
+    if isinstance(storage, str):
+        return STORAGE_BACKENDS[storage]()
+    return storage
+
+
+def dataset_filename(filename, storage=None):
+    return os.path.splitext(filename)[0] + get_storage(storage).extension
+
+
+def is_dataset_file(filename):
+    return os.path.splitext(filename)[1] in {backend.extension for backend in FILE_BACKENDS.values()}
+
+
+# Read a dataset file with the backend matching its extension
+def read_dataset(filepath):
+    extension = os.path.splitext(filepath)[1]
+    for backend in FILE_BACKENDS.values():
+        if backend.extension == extension:
+            return backend().read(filepath)
+    raise ValueError(f"Unsupported dataset file: {filepath}")
+
+
+# A DataFrame can only exist once pandas has been imported, so plain text
+# saves never trigger the import
+def _is_frame(data):
+    pandas = sys.modules.get('pandas')
+    return pandas is not None and isinstance(data, pandas.DataFrame)
+
+
+def _count_written(filepath):
+    extension = os.path.splitext(filepath)[1].lstrip('.') or 'none'
+    files_written.inc(extension)
+    try:
+        bytes_written.inc(extension, amount=os.path.getsize(filepath))
+    except OSError:
+        pass
+
+
+# Directories whose fsync is deferred. File contents are always synced
+# before their rename (a crash must never leave a renamed but empty file);
+# what a run batches is the directory sync that makes the renames durable,
+# done once per directory by flush() instead of once per file.
+class FsyncBatch:
+    def __init__(self):
+        self._directories = []
+        self._lock = threading.Lock()
+
+    def add(self, directory):
+        with self._lock:
+            if directory not in self._directories:
+                self._directories.append(directory)
+
+    def flush(self):
+        with self._lock:
+            directories, self._directories = self._directories, []
+        for directory in directories:
+            _fsync_path(directory, directory=True)
+
+
+def _fsync_path(path, directory=False):
+    try:
+        fd = os.open(path, os.O_RDONLY | (getattr(os, 'O_DIRECTORY', 0) if directory else 0))
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Some platforms and filesystems cannot fsync directories
+        pass
+    finally:
+        os.close(fd)
+
+
+# Write a file atomically: write(tmp_path) fills a temporary file next to
+# `filepath`, which then replaces it in one rename, so readers see either
+# the old or the new file and never a partial one. With fsync the temporary
+# file is synced before the rename; fsync=True then syncs the directory
+# straight away, an FsyncBatch defers that to its flush().
+def _atomic_write(filepath, write, fsync=False):
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp_path)
+        if fsync:
+            _fsync_path(tmp_path)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    directory = os.path.dirname(filepath) or "."
+    if fsync is True:
+        _fsync_path(directory, directory=True)
+    elif fsync:
+        fsync.add(directory)
+
+
+# Writer for _atomic_write that appends to an existing file: copies its
+# first `keep` bytes (all of them when None) and then writes `payload`.
+# Bytes are copied without parsing, so this costs little next to a fetch.
+def _append_bytes(source, payload, keep=None):
+    def write(path):
+        with open(source, 'rb') as src, open(path, 'wb') as dst:
+            remaining = keep
+            while remaining is None or remaining > 0:
+                chunk = src.read(1024 * 1024 if remaining is None else min(1024 * 1024, remaining))
+                if not chunk:
+                    break
+                dst.write(chunk)
+                if remaining is not None:
+                    remaining -= len(chunk)
+            dst.write(payload)
+    return write
+
+
+def _write_bytes(payload):
+    def write(path):
+        with open(path, 'wb') as f:
+            f.write(payload)
+    return write
+
+
+def _write_text(content):
+    def write(path):
+        with open(path, 'w') as f:
+            f.write(content)
+    return write
+
+
+# Save data function. Files are replaced atomically; `fsync` is False, True
+# (sync every file and its directory) or an FsyncBatch deferring the
+# directory syncs.
+def save_data(data, filename, output_dir, logger, storage=None, fsync=False):
+    storage = get_storage(storage)
+    if _is_frame(data) or isinstance(data, dict):
+        filename = dataset_filename(filename, storage)
     filepath = os.path.join(output_dir, filename)
 
     # Check if data is empty before saving
-    if data is None or (isinstance(data, pd.DataFrame) and data.empty):
+    if data is None or (_is_frame(data) and data.empty):
         logger.warning(f"Skipping save for {filename}: Data is empty")
         return False
 
     try:
-        if isinstance(data, pd.DataFrame):
-            data.to_csv(filepath, index=True)
+        if _is_frame(data):
+            _atomic_write(filepath, lambda path: storage.write(data, path), fsync)
             logger.info(f"Saved DataFrame to {filepath} with {len(data)} rows")
+            _count_written(filepath)
             return True
         elif isinstance(data, dict):
             df = pd.DataFrame.from_dict(data, orient='index', columns=['Value'])
             if not df.empty:
-                df.to_csv(filepath)
+                _atomic_write(filepath, lambda path: storage.write(df, path), fsync)
                 logger.info(f"Saved dict to {filepath} with {len(df)} rows")
+                _count_written(filepath)
                 return True
             else:
                 logger.warning(f"Skipping save for {filename}: Dict converted to empty DataFrame")
@@ -83,9 +686,9 @@ def save_data(data, filename, output_dir, logger):
         else:
             content = str(data)
             if content.strip():
-                with open(filepath, 'w') as f:
-                    f.write(content)
+                _atomic_write(filepath, _write_text(content), fsync)
                 logger.info(f"Saved data to {filepath} ({len(content)} characters)")
+                _count_written(filepath)
                 return True
             else:
                 logger.warning(f"Skipping save for {filename}: Empty string")
@@ -95,216 +698,1065 @@ def save_data(data, filename, output_dir, logger):
         return False
 
 
-# Get stock data function
-def get_stock_data(ticker_symbol, ticker_name, retry_count=3, delay=2, logger=None):
-    if logger is None:
-        logger, _ = setup_logging(ticker_name)
+# Time-to-live (seconds) of cached responses per endpoint. Statements change at
+# most quarterly; news and the info snapshot go stale quickly.
+DATASET_TTLS = {
+    'info': 3600,
+    'history': 24 * 3600,
+    'income_stmt': 7 * 24 * 3600,
+    'balance_sheet': 7 * 24 * 3600,
+    'cashflow': 7 * 24 * 3600,
+    'quarterly_income_stmt': 7 * 24 * 3600,
+    'quarterly_balance_sheet': 7 * 24 * 3600,
+    'quarterly_cashflow': 7 * 24 * 3600,
+    'major_holders': 24 * 3600,
+    'recommendations': 24 * 3600,
+    'sustainability': 7 * 24 * 3600,
+    'news': 900,
+    'actions': 24 * 3600,
+    'dividends': 24 * 3600,
+    'splits': 24 * 3600,
+}
+DEFAULT_TTL = 3600
+
+
+# Persistent on-disk cache of yfinance responses, one pickle per
+# (symbol, endpoint, params). Entries older than their endpoint's TTL count
+# as stale and are refetched; once the directory grows past max_bytes the
+# least recently used entries are evicted.
+class ResponseCache:
+    def __init__(self, cache_dir=".scraper_cache", max_bytes=512 * 1024 * 1024, ttls=None, low_watermark=0.8):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # Eviction trims to this fraction of max_bytes, so the directory is
+        # not rescanned on every put once the cache is full
+        self.low_watermark = low_watermark
+        self.ttls = dict(DATASET_TTLS, **(ttls or {}))
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in os.scandir(cache_dir) if entry.name.endswith('.pkl'))
+
+    def _path(self, symbol, endpoint, params):
+        key = repr((symbol, endpoint, sorted((params or {}).items())))
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + '.pkl')
+
+    def _count(self, stat, endpoint):
+        cache_lookups.inc(endpoint, stat)
+        with self._lock:
+            self.stats[stat] += 1
+
+    # Returns (True, value) for a fresh entry, (False, None) otherwise
+    def get(self, symbol, endpoint, params=None):
+        path = self._path(symbol, endpoint, params)
+        try:
+            with open(path, 'rb') as f:
+                fetched_at, value = pickle.load(f)
+        except FileNotFoundError:
+            self._count('misses', endpoint)
+            return False, None
+        except Exception:
+            # Truncated, or pickled under other pandas/yfinance versions
+            # (ModuleNotFoundError, AttributeError, ...): drop the entry, or
+            # it would fail every run without ever going stale
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self._count('misses', endpoint)
+            return False, None
 
-    logger.info(f"Fetching data for {ticker_name} ({ticker_symbol})")
-    successful_files = 0
-    generated_files = []
-    summary_report_path = None
+        if time.time() - fetched_at > self.ttls.get(endpoint, DEFAULT_TTL):
+            self._count('stale', endpoint)
+            return False, None
 
-    try:
-        # Create Ticker object with retry mechanism
-        ticker = None
-        for attempt in range(retry_count):
-            try:
-                ticker = yf.Ticker(ticker_symbol)
-                # Quick validation to check if the ticker is valid
-                _ = ticker.info.get('shortName', None)
-                logger.info(f"Successfully created Ticker object for {ticker_symbol}")
+        # Bump the mtime so eviction sees this entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count('hits', endpoint)
+        return True, value
+
+    def put(self, symbol, endpoint, value, params=None):
+        path = self._path(symbol, endpoint, params)
+        payload = pickle.dumps((time.time(), value), protocol=pickle.HIGHEST_PROTOCOL)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        _atomic_write(path, _write_bytes(payload))
+
+        with self._lock:
+            self._size += len(payload) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    # Remove least recently used entries until the cache is down to the low
+    # watermark. Called with the lock held.
+    def _evict(self):
+        entries = sorted((e for e in os.scandir(self.cache_dir) if e.name.endswith('.pkl')),
+                         key=lambda e: e.stat().st_mtime)
+        self._size = sum(e.stat().st_size for e in entries)
+        target = self.max_bytes * self.low_watermark
+        for entry in entries:
+            if self._size <= target:
                 break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self._size -= size
+            self.stats['evictions'] += 1
+            cache_evictions.inc()
+
+    def summary(self):
+        with self._lock:
+            return ", ".join(f"{count} {stat}" for stat, count in self.stats.items())
+
+
+# Retry policy for upstream requests: exponential backoff with full jitter,
+# bounded both by attempt count and by total elapsed time. Only errors that
+# look transient (throttling, network failures, 5xx responses) are retried.
+class RetryPolicy:
+    TRANSIENT_MARKERS = ('timed out', 'temporarily unavailable', 'connection reset', 'connection aborted',
+                         'connection refused')
+
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=30.0, max_elapsed=120.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+
+    # Retry throttling (429), server errors (5xx) and network failures; any
+    # other status, such as a 404 for an unknown symbol, fails straight away
+    def is_retryable(self, error):
+        if _is_rate_limited(error):
+            return True
+        status = _http_status(error)
+        if status is not None:
+            return status >= 500
+        if _is_network_error(error):
+            return True
+        if isinstance(error, (KeyError, ValueError, TypeError, AttributeError)):
+            return False
+        message = str(error).lower()
+        return any(marker in message for marker in self.TRANSIENT_MARKERS)
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    # Call fn until it succeeds, the error is not retryable, or the attempt or
+    # time budget runs out. on_retry(attempt, error, wait) is called before
+    # each sleep.
+    def call(self, fn, *args, on_retry=None, **kwargs):
+        start = time.monotonic()
+        for attempt in range(self.max_attempts):
+            try:
+                return fn(*args, **kwargs)
             except Exception as e:
-                if attempt < retry_count - 1:
-                    logger.warning(f"Attempt {attempt + 1}/{retry_count} failed: {str(e)}. Retrying...")
-                    time.sleep(delay)
-                else:
-                    logger.error(f"Failed to create Ticker object after {retry_count} attempts: {str(e)}")
-                    return False, [], None
-
-        if ticker is None:
-            return False, [], None
-
-        output_dir = create_output_directory(ticker_symbol)
+                if attempt == self.max_attempts - 1 or not self.is_retryable(e):
+                    raise
+                wait = self.backoff(attempt)
+                if time.monotonic() - start + wait > self.max_elapsed:
+                    raise
+                if on_retry is not None:
+                    on_retry(attempt + 1, e, wait)
+                time.sleep(wait)
+
+
+# Wraps a yf.Ticker so that every endpoint read goes through fetch(). Data
+# attributes (ticker.info, ticker.balance_sheet, ...) and history() are
+# memoized for the lifetime of the client, so one scrape never hits the same
+# endpoint twice (concurrent readers of an in-flight endpoint wait for the
+# first request). Misses are served from the response cache when one is
+# given, and upstream requests are retried according to the retry policy.
+class TickerClient:
+    def __init__(self, ticker, cache=None, retry_policy=None, logger=None):
+        self._ticker = ticker
+        self._cache = cache
+        self._retry_policy = retry_policy or RetryPolicy(max_attempts=1)
+        self._logger = logger
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+        self.symbol = ticker.ticker
+        self.retries = {}
+
+    def fetch(self, endpoint, **params):
+        key = (endpoint, tuple(sorted(params.items())))
+        with self._memo_lock:
+            future = self._memo.get(key)
+            owner = future is None
+            if owner:
+                future = self._memo[key] = Future()
+        if not owner:
+            return future.result()
 
-        # 1. Basic company info
-        logger.info("Fetching company information")
         try:
-            info = ticker.info
-            if info and len(info) > 0:
-                filename = "company_info.csv"
-                if save_data(pd.DataFrame.from_dict(info, orient='index', columns=['Value']),
-                             filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
+            value = self._fetch(endpoint, params)
         except Exception as e:
-            logger.warning(f"Failed to fetch company information: {str(e)}")
+            # Forget failures so a later read can try again
+            with self._memo_lock:
+                del self._memo[key]
+            future.set_exception(e)
+            raise
+        future.set_result(value)
+        return value
+
+    def _fetch(self, endpoint, params):
+        if self._cache is not None:
+            found, value = self._cache.get(self.symbol, endpoint, params)
+            if found:
+                return value
+
+        def on_retry(attempt, error, wait):
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+            upstream_retries.inc(endpoint)
+            if self._logger is not None:
+                self._logger.warning(f"Retrying {endpoint} for {self.symbol} in {wait:.1f}s "
+                                     f"(attempt {attempt}/{self._retry_policy.max_attempts} failed: {str(error)})")
+
+        value = self._retry_policy.call(self._request, endpoint, params, on_retry=on_retry)
+
+        if self._cache is not None:
+            self._cache.put(self.symbol, endpoint, value, params)
+        return value
+
+    def _request(self, endpoint, params):
+        # Properties (info, balance_sheet, ...) fetch on access; methods such
+        # as history() fetch when called
+        attribute = getattr(type(self._ticker), endpoint, None)
+        if isinstance(attribute, property) or not callable(attribute):
+            return _upstream_call(getattr, self._ticker, endpoint, endpoint=endpoint)
+        return _upstream_call(getattr(self._ticker, endpoint), endpoint=endpoint, **params)
+
+    def history(self, **params):
+        return self.fetch('history', **params)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self.fetch(name)
+
+
+# Per-ticker checkpoint manifest: for every dataset, its status ('ok', 'empty'
+# or 'failed'), row count, content hash and fetch time. Written after each
+# dataset so an interrupted scrape can be resumed.
+MANIFEST_FILENAME = "manifest.json"
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILENAME), 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault('datasets', {})
+    return manifest
+
+
+# Written atomically with a unique temp name, so concurrent scrapes of one
+# ticker (two UI sessions, the UI and the daemon) cannot trip over each
+# other. With a logger, a failed write is logged rather than raised: the
+# datasets themselves are already saved.
+def save_manifest(manifest, output_dir, logger=None, fsync=False):
+    filepath = os.path.join(output_dir, MANIFEST_FILENAME)
+    manifest['updated_at'] = datetime.now(timezone.utc).isoformat()
+    try:
+        _atomic_write(filepath, _write_text(json.dumps(manifest, indent=2, default=str)), fsync)
+        return True
+    except Exception as e:
+        if logger is None:
+            raise
+        logger.warning(f"Failed to update {filepath}: {str(e)}")
+        return False
 
-        # 2. Historical market data
-        logger.info("Fetching historical market data (max period)")
-        try:
-            hist = ticker.history(period="max")
-            if not hist.empty:
-                filename = "historical_data.csv"
-                if save_data(hist, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch historical data: {str(e)}")
 
-        # 3. Financials
-        logger.info("Fetching income statement")
-        try:
-            income_stmt = ticker.income_stmt
-            if not income_stmt.empty:
-                filename = "income_statement.csv"
-                if save_data(income_stmt, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch income statement: {str(e)}")
+# Stable content hash of a DataFrame (values, index and column labels).
+# Object columns are hashed by their string form, since yfinance puts lists
+# and dicts in them (e.g. companyOfficers in info). Returns None when the
+# frame cannot be hashed; a missing hash must never fail a dataset.
+def _frame_hash(frame):
+    try:
+        object_columns = {c: str for c, dtype in frame.dtypes.items() if dtype == object}
+        if object_columns:
+            frame = frame.astype(object_columns)
+        digest = hashlib.sha256()
+        digest.update(repr(list(frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=True).values.tobytes())
+        return digest.hexdigest()
+    except Exception:
+        return None
+
+
+def _manifest_entry(filename, status, rows=None, content_hash=None, error=None):
+    entry = {
+        'file': filename,
+        'status': status,
+        'rows': rows,
+        'hash': content_hash,
+        'fetched_at': datetime.now(timezone.utc).isoformat(),
+    }
+    if error:
+        entry['error'] = error
+    return entry
+
+
+# A dataset counts as complete when it was fetched successfully (or found to
+# be empty upstream) within its freshness window and its file is still there
+def _is_complete(entry, output_dir, max_age):
+    if not entry or entry.get('status') not in ('ok', 'empty'):
+        return False
+    if entry['status'] == 'ok' and not os.path.exists(os.path.join(output_dir, entry['file'])):
+        return False
+    try:
+        fetched_at = datetime.fromisoformat(entry['fetched_at'])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return (datetime.now(timezone.utc) - fetched_at).total_seconds() < max_age
 
-        logger.info("Fetching balance sheet")
-        try:
-            balance_sheet = ticker.balance_sheet
-            if not balance_sheet.empty:
-                filename = "balance_sheet.csv"
-                if save_data(balance_sheet, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch balance sheet: {str(e)}")
 
-        logger.info("Fetching cash flow")
-        try:
-            cash_flow = ticker.cashflow
-            if not cash_flow.empty:
-                filename = "cash_flow.csv"
-                if save_data(cash_flow, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch cash flow: {str(e)}")
+# A fetched dataset need not be rewritten when its content hash matches the
+# one recorded for the last successful save and that file is still there
+def _is_unchanged(entry, filename, content_hash, output_dir):
+    if not entry or entry.get('status') != 'ok' or entry.get('hash') != content_hash:
+        return False
+    return entry.get('file') == filename and os.path.exists(os.path.join(output_dir, filename))
 
-        # 4. Quarterly financials
-        logger.info("Fetching quarterly income statement")
-        try:
-            quarterly_income = ticker.quarterly_income_stmt
-            if not quarterly_income.empty:
-                filename = "quarterly_income_statement.csv"
-                if save_data(quarterly_income, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch quarterly income statement: {str(e)}")
 
-        logger.info("Fetching quarterly balance sheet")
-        try:
-            quarterly_balance = ticker.quarterly_balance_sheet
-            if not quarterly_balance.empty:
-                filename = "quarterly_balance_sheet.csv"
-                if save_data(quarterly_balance, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch quarterly balance sheet: {str(e)}")
+# Rows to write over the tail of an existing historical_data.csv. `offset` is
+# the byte position of the stored last bar, which is rewritten because it may
+# have been a partial (intraday) bar when it was saved.
+HistoryUpdate = namedtuple('HistoryUpdate', ['frame', 'offset'])
 
-        logger.info("Fetching quarterly cash flow")
-        try:
-            quarterly_cashflow = ticker.quarterly_cashflow
-            if not quarterly_cashflow.empty:
-                filename = "quarterly_cash_flow.csv"
-                if save_data(quarterly_cashflow, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch quarterly cash flow: {str(e)}")
 
-        # 5. Major shareholders
-        logger.info("Fetching major shareholders")
-        try:
-            major_holders = ticker.major_holders
-            if major_holders is not None and not major_holders.empty:
-                filename = "major_holders.csv"
-                if save_data(major_holders, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch major holders: {str(e)}")
+# Append new bars to an existing history file, replacing the stored last bar.
+# The file is rebuilt next to the original and renamed into place, like
+# save_data, so readers never see a truncated history.
+def append_history(update, filename, output_dir, logger, fsync=False):
+    filepath = os.path.join(output_dir, filename)
 
-        # 6. Analyst recommendations
-        logger.info("Fetching analyst recommendations")
-        try:
-            recommendations = ticker.recommendations
-            if recommendations is not None and not recommendations.empty:
-                filename = "recommendations.csv"
-                if save_data(recommendations, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch recommendations: {str(e)}")
+    if update.frame is None or update.frame.empty:
+        logger.info(f"{filepath} is already up to date")
+        return True
 
-        # 7. ESG data
-        logger.info("Fetching ESG data")
-        try:
-            esg_data = ticker.sustainability
-            if esg_data is not None and not esg_data.empty:
-                filename = "esg_data.csv"
-                if save_data(esg_data, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch ESG data: {str(e)}")
+    try:
+        payload = update.frame.to_csv(header=False, index=True).encode()
+        _atomic_write(filepath, _append_bytes(filepath, payload, keep=update.offset), fsync)
+        logger.info(f"Appended {len(update.frame)} rows to {filepath}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to append data to {filepath}: {str(e)}")
+        return False
 
-        # 8. News articles
-        logger.info("Fetching news articles")
-        try:
-            news = ticker.news
-            if news and len(news) > 0:
-                filename = "news.csv"
-                news_df = pd.DataFrame(news)
-                if save_data(news_df, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch news: {str(e)}")
 
-        # 9. Actions (dividends, splits)
-        logger.info("Fetching actions (dividends, splits)")
+NEWS_COLUMNS = ['id', 'title', 'summary', 'pubDate', 'provider', 'url', 'contentType']
+
+
+def _nested(mapping, *keys):
+    for key in keys:
+        if not isinstance(mapping, dict):
+            return None
+        mapping = mapping.get(key)
+    return mapping
+
+
+# Flatten yfinance news items into typed columns, one row per article id.
+# Handles both the current shape (fields nested under 'content') and the
+# older flat shape (uuid, publisher, link, providerPublishTime).
+def flatten_news(items):
+    rows = []
+    for item in items:
+        content = item.get('content') if isinstance(item.get('content'), dict) else item
+        published = content.get('pubDate')
+        if published is None and item.get('providerPublishTime') is not None:
+            published = datetime.fromtimestamp(item['providerPublishTime'], tz=timezone.utc).isoformat()
+        rows.append({
+            'id': item.get('id') or content.get('id') or item.get('uuid'),
+            'title': content.get('title'),
+            'summary': content.get('summary') or content.get('description') or None,
+            'pubDate': published,
+            'provider': _nested(content, 'provider', 'displayName') or item.get('publisher'),
+            'url': (_nested(content, 'canonicalUrl', 'url') or _nested(content, 'clickThroughUrl', 'url')
+                    or item.get('link')),
+            'contentType': content.get('contentType') or item.get('type'),
+        })
+
+    frame = pd.DataFrame(rows, columns=NEWS_COLUMNS)
+    frame = frame[frame['id'].notna()].drop_duplicates('id').set_index('id')
+    frame['pubDate'] = pd.to_datetime(frame['pubDate'], utc=True, errors='coerce')
+    return frame
+
+
+# Convert news saved before flattening (an 'id' column and a repr'd dict in
+# 'content') to the flat layout
+def _flatten_legacy_news(frame):
+    items = []
+    for value in frame['content']:
         try:
-            actions = ticker.actions
-            if actions is not None and not actions.empty:
-                filename = "actions.csv"
-                if save_data(actions, filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
-        except Exception as e:
-            logger.warning(f"Failed to fetch actions: {str(e)}")
+            items.append({'content': ast.literal_eval(value)} if isinstance(value, str) else {'content': value})
+        except (ValueError, SyntaxError):
+            continue
+    return flatten_news(items)
+
+
+# Combine stored and newly fetched articles, keeping the first copy of each id
+def _merge_news(existing, new):
+    if existing is None or existing.empty:
+        return new
+    combined = pd.concat([existing, new])
+    combined = combined[~combined.index.duplicated(keep='first')]
+    combined['pubDate'] = pd.to_datetime(combined['pubDate'], utc=True, errors='coerce')
+    return combined
+
+
+# Save flattened news into the per-ticker news store. With CSV storage only
+# articles whose id is not stored yet are appended; other formats (and files
+# still in the old layout) are merged and rewritten.
+def save_news(frame, filename, output_dir, logger, storage=None, fsync=False):
+    storage = get_storage(storage)
+    filepath = os.path.join(output_dir, dataset_filename(filename, storage))
+    if not os.path.exists(filepath):
+        return save_data(frame, filename, output_dir, logger, storage=storage, fsync=fsync)
+
+    try:
+        if storage.extension == '.csv':
+            with open(filepath, 'r', newline='') as f:
+                header = f.readline().strip().split(',')
+            if header == NEWS_COLUMNS:
+                stored_ids = set(pd.read_csv(filepath, usecols=['id'])['id'])
+                new = frame[~frame.index.isin(stored_ids)]
+                if not new.empty:
+                    payload = new.to_csv(header=False, index=True).encode()
+                    _atomic_write(filepath, _append_bytes(filepath, payload), fsync)
+                logger.info(f"Appended {len(new)} new articles to {filepath} ({len(stored_ids)} already stored)")
+                return True
 
-        # 10. Dividends
-        logger.info("Fetching dividends")
+        existing = read_dataset(filepath)
+        if 'content' in existing.columns:
+            existing = _flatten_legacy_news(existing)
+        elif 'id' in existing.columns:
+            existing = existing.set_index('id')
+        return save_data(_merge_news(existing, frame), filename, output_dir, logger, storage=storage, fsync=fsync)
+    except Exception as e:
+        logger.error(f"Failed to update news store {filepath}: {str(e)}")
+        return False
+
+
+def _stored_sqlite_news(storage, db_path, symbol):
+    if not os.path.exists(db_path) or 'news' not in storage.list_tables(db_path):
+        return None
+    frame = storage.read_table(db_path, 'news', symbol).drop(columns='symbol')
+    return frame.set_index('id') if 'id' in frame.columns else None
+
+
+# Read the header and the last row of a CSV without parsing the whole file.
+# Returns the last row as a one-row DataFrame and the byte offset where that
+# row starts, or (None, None) when the file holds no rows.
+def _read_last_row(filepath, block_size=4096):
+    with open(filepath, 'rb') as f:
+        header = f.readline()
+        header_end = f.tell()
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        while True:
+            start = max(header_end, size - block_size)
+            f.seek(start)
+            tail = f.read(size - start)
+            lines = tail.rstrip(b'\r\n').splitlines(keepends=True)
+            if len(lines) > 1 or start == header_end:
+                break
+            block_size *= 2
+
+    if not lines:
+        return None, None
+    last_line = lines[-1]
+    offset = start + len(tail.rstrip(b'\r\n')) - len(last_line)
+    last_row = pd.read_csv(io.BytesIO(header + last_line), index_col=0)
+    return last_row, offset
+
+
+def _to_utc(index):
+    index = pd.DatetimeIndex(index)
+    return index.tz_convert('UTC') if index.tz is not None else index.tz_localize('UTC')
+
+
+# Dataset sections scraped for every ticker, in the order they are reported.
+# Keys match the Ticker endpoint names used for DATASET_TTLS. Each loader
+# takes a yf.Ticker and returns the data to save, or None when the endpoint
+# has nothing for this ticker.
+DatasetSection = namedtuple('DatasetSection', ['key', 'filename', 'label', 'error_label', 'loader'])
+
+
+def _load_company_info(ticker):
+    info = ticker.info
+    if info and len(info) > 0:
+        return pd.DataFrame.from_dict(info, orient='index', columns=['Value'])
+    return None
+
+
+def _load_frame(attribute):
+    def loader(ticker):
+        data = getattr(ticker, attribute)
+        if data is not None and not data.empty:
+            return data
+        return None
+    return loader
+
+
+def _load_history(ticker):
+    hist = ticker.history(period="max")
+    return hist if not hist.empty else None
+
+
+# History loader for incremental refreshes: requests bars from the last date
+# stored in `filepath` onward and returns a HistoryUpdate for them. Prices are
+# dividend/split adjusted, so a new dividend or split (or a stored bar whose
+# prices no longer match) restates the whole series; in that case the full
+# history is fetched and the file rewritten.
+def _incremental_history_loader(filepath, logger):
+    def loader(ticker):
+        last_row, offset = _read_last_row(filepath) if os.path.exists(filepath) else (None, None)
+        if last_row is None:
+            return _load_history(ticker)
+
+        last_bar = pd.Timestamp(last_row.index[0])
+        last_utc = _to_utc([last_bar])[0]
+        recent = ticker.history(start=last_bar.strftime('%Y-%m-%d'))
+        if recent.empty:
+            return HistoryUpdate(None, offset)
+
+        recent_utc = _to_utc(recent.index)
+        overlap = recent[recent_utc == last_utc]
+        new_bars = recent[recent_utc > last_utc]
+        actions = [c for c in ['Dividends', 'Stock Splits'] if c in recent.columns]
+
+        # Appended rows must line up with the stored header; a file written by
+        # a bulk run lacks columns such as Capital Gains, so refetch instead
+        restated = overlap.empty or [str(c) for c in last_row.columns] != [str(c) for c in recent.columns]
+        if not restated and actions:
+            restated = (new_bars[actions] != 0).any().any() or any(
+                float(overlap[c].iloc[0]) != float(last_row[c].iloc[0]) for c in actions if c in last_row.columns)
+        if not restated and 'Open' in last_row.columns:
+            stored_open = float(last_row['Open'].iloc[0])
+            restated = abs(float(overlap['Open'].iloc[0]) - stored_open) > 1e-6 * max(abs(stored_open), 1.0)
+
+        if restated:
+            logger.info("Dividend, split, price or column restatement detected; refetching full history")
+            return _load_history(ticker)
+
+        return HistoryUpdate(recent[recent_utc >= last_utc], offset)
+    return loader
+
+
+def _load_news(ticker):
+    news = ticker.news
+    if news and len(news) > 0:
+        return flatten_news(news)
+    return None
+
+
+def _load_series(attribute):
+    def loader(ticker):
+        data = getattr(ticker, attribute)
+        if data is not None and len(data) > 0:
+            return pd.DataFrame(data)
+        return None
+    return loader
+
+
+DATASET_SECTIONS = [
+    DatasetSection('info', 'company_info.csv', 'company information', 'company information',
+                   _load_company_info),
+    DatasetSection('history', 'historical_data.csv', 'historical market data (max period)', 'historical data',
+                   _load_history),
+    DatasetSection('income_stmt', 'income_statement.csv', 'income statement', 'income statement',
+                   _load_frame('income_stmt')),
+    DatasetSection('balance_sheet', 'balance_sheet.csv', 'balance sheet', 'balance sheet',
+                   _load_frame('balance_sheet')),
+    DatasetSection('cashflow', 'cash_flow.csv', 'cash flow', 'cash flow',
+                   _load_frame('cashflow')),
+    DatasetSection('quarterly_income_stmt', 'quarterly_income_statement.csv', 'quarterly income statement',
+                   'quarterly income statement', _load_frame('quarterly_income_stmt')),
+    DatasetSection('quarterly_balance_sheet', 'quarterly_balance_sheet.csv', 'quarterly balance sheet',
+                   'quarterly balance sheet', _load_frame('quarterly_balance_sheet')),
+    DatasetSection('quarterly_cashflow', 'quarterly_cash_flow.csv', 'quarterly cash flow',
+                   'quarterly cash flow', _load_frame('quarterly_cashflow')),
+    DatasetSection('major_holders', 'major_holders.csv', 'major shareholders', 'major holders',
+                   _load_frame('major_holders')),
+    DatasetSection('recommendations', 'recommendations.csv', 'analyst recommendations', 'recommendations',
+                   _load_frame('recommendations')),
+    DatasetSection('sustainability', 'esg_data.csv', 'ESG data', 'ESG data',
+                   _load_frame('sustainability')),
+    DatasetSection('news', 'news.csv', 'news articles', 'news',
+                   _load_news),
+    DatasetSection('actions', 'actions.csv', 'actions (dividends, splits)', 'actions',
+                   _load_frame('actions')),
+    DatasetSection('dividends', 'dividends.csv', 'dividends', 'dividends',
+                   _load_series('dividends')),
+    DatasetSection('splits', 'splits.csv', 'splits', 'splits',
+                   _load_series('splits')),
+]
+
+
+# Bound on simultaneous in-flight requests per upstream host. Every fetch path
+# (ticker validation, section loaders, batch workers) takes a slot before
+# talking to Yahoo, so nested pools cannot multiply the load on the host.
+UPSTREAM_HOST = "finance.yahoo.com"
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+
+def set_host_concurrency(limit, host=UPSTREAM_HOST):
+    with _host_slots_lock:
+        _host_slots[host] = threading.BoundedSemaphore(limit) if limit else None
+
+
+@contextmanager
+def _host_slot(host=UPSTREAM_HOST):
+    semaphore = _host_slots.get(host)
+    if semaphore is None:
+        yield
+        return
+    with semaphore:
+        yield
+
+
+# Process-wide token bucket pacing every upstream request. Tokens refill at
+# `rate` per second up to `burst`. The rate halves whenever Yahoo answers
+# with HTTP 429 and creeps back towards the configured rate after a run of
+# successful requests.
+class RateLimiter:
+    def __init__(self, rate=2.0, burst=5, min_rate=0.1, recovery_after=20):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.recovery_after = recovery_after
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def configure(self, rate=None, burst=None):
+        with self._lock:
+            if rate is not None:
+                self.max_rate = self.rate = rate
+            if burst is not None:
+                self.burst = burst
+                self._tokens = min(self._tokens, float(burst))
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.recovery_after and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+                self._successes = 0
+
+    def on_throttled(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            self._successes = 0
+
+
+rate_limiter = RateLimiter()
+
+
+def configure_rate_limit(rate=None, burst=None):
+    rate_limiter.configure(rate=rate, burst=burst)
+
+
+def _is_rate_limited(error):
+    message = str(error)
+    return (type(error).__name__ == 'YFRateLimitError' or _http_status(error) == 429
+            or 'Too Many Requests' in message or 'Rate limited' in message)
+
+
+# Make one upstream request: wait for a host slot and a rate limiter token,
+# then feed the outcome back into the limiter and the request metrics
+# (labelled with `endpoint`, by default the name of fn)
+def _upstream_call(fn, *args, endpoint=None, **kwargs):
+    endpoint = endpoint or getattr(fn, '__name__', 'unknown')
+    with _host_slot():
+        rate_limiter.acquire()
+        start = time.monotonic()
         try:
-            dividends = ticker.dividends
-            if dividends is not None and len(dividends) > 0:
-                filename = "dividends.csv"
-                if save_data(pd.DataFrame(dividends), filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
+            result = fn(*args, **kwargs)
         except Exception as e:
-            logger.warning(f"Failed to fetch dividends: {str(e)}")
+            upstream_request_seconds.observe(time.monotonic() - start, endpoint)
+            upstream_requests.inc(endpoint, _status_class(e))
+            if _is_rate_limited(e):
+                rate_limiter.on_throttled()
+            raise
+    upstream_request_seconds.observe(time.monotonic() - start, endpoint)
+    upstream_requests.inc(endpoint, _status_class())
+    rate_limiter.on_success()
+    return result
+
+
+# Returns (data, error, elapsed seconds); data is None when the section is
+# empty or failed. Prefetched sections take no time here.
+def _fetch_section(ticker, section, logger, prefetched=None):
+    if prefetched and section.key in prefetched:
+        logger.info(f"Using prefetched {section.label}")
+        return prefetched[section.key], None, 0.0
+
+    logger.info(f"Fetching {section.label}")
+    start = time.monotonic()
+    try:
+        data = section.loader(ticker)
+    except Exception as e:
+        logger.warning(f"Failed to fetch {section.error_label}: {str(e)}")
+        elapsed = time.monotonic() - start
+        dataset_fetch_seconds.observe(elapsed, section.key, 'failed')
+        return None, str(e), elapsed
+    elapsed = time.monotonic() - start
+    dataset_fetch_seconds.observe(elapsed, section.key, 'empty' if data is None else 'ok')
+    return data, None, elapsed
+
+
+# Fetch every section, either one after another or fanned out over a bounded
+# thread pool. Results are always yielded in section order so that files are
+# saved (and logged) from the calling thread in a deterministic sequence.
+def _fetch_sections(ticker, sections, logger, max_workers=1, prefetched=None):
+    # Nothing left to fetch (e.g. a fully resumed ticker)
+    if not sections:
+        return
+    if max_workers <= 1:
+        for section in sections:
+            yield (section,) + _fetch_section(ticker, section, logger, prefetched)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(sections))) as executor:
+        futures = [(section, executor.submit(_fetch_section, ticker, section, logger, prefetched))
+                   for section in sections]
+        for section, future in futures:
+            yield (section,) + future.result()
+
+
+HISTORY_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
+
+# Shape one symbol's slice of a yf.download frame like Ticker.history output
+def _normalize_bulk_history(frame):
+    frame = frame.dropna(how='all', subset=[c for c in ['Open', 'High', 'Low', 'Close'] if c in frame.columns])
+    if frame.empty:
+        return None
+    frame = frame[[c for c in HISTORY_COLUMNS if c in frame.columns]].copy()
+    frame.columns.name = None
+    for column in ['Dividends', 'Stock Splits']:
+        if column in frame.columns:
+            frame[column] = frame[column].fillna(0.0)
+    if 'Volume' in frame.columns and not frame['Volume'].isna().any():
+        frame['Volume'] = frame['Volume'].astype('int64')
+    return frame
+
+
+# Download max-period history for many symbols with one yf.download call per
+# chunk and split the combined frame back into per-symbol frames laid out
+# like historical_data.csv. Symbols missing from the result are left out so
+# callers can fall back to Ticker.history.
+def download_history(symbols, chunk_size=50, logger=None):
+    if logger is None:
+        with logging_scope("bulk_history") as (logger, _):
+            return download_history(symbols, chunk_size=chunk_size, logger=logger)
 
-        # 11. Splits
-        logger.info("Fetching splits")
+    histories = {}
+    for start in range(0, len(symbols), chunk_size):
+        chunk = list(symbols[start:start + chunk_size])
+        logger.info(f"Bulk downloading historical market data for {len(chunk)} tickers")
         try:
-            splits = ticker.splits
-            if splits is not None and len(splits) > 0:
-                filename = "splits.csv"
-                if save_data(pd.DataFrame(splits), filename, output_dir, logger):
-                    successful_files += 1
-                    generated_files.append(os.path.join(output_dir, filename))
+            data = _upstream_call(yf.download, chunk, period="max", group_by="ticker", actions=True,
+                                  auto_adjust=True, ignore_tz=False, progress=False)
         except Exception as e:
-            logger.warning(f"Failed to fetch splits: {str(e)}")
+            logger.warning(f"Bulk history download failed for {', '.join(chunk)}: {str(e)}")
+            continue
+        if data is None or data.empty:
+            continue
+
+        if isinstance(data.columns, pd.MultiIndex):
+            available = set(data.columns.get_level_values(0))
+            for symbol in chunk:
+                if symbol in available:
+                    frame = _normalize_bulk_history(data[symbol])
+                    if frame is not None:
+                        histories[symbol] = frame
+        elif len(chunk) == 1:
+            frame = _normalize_bulk_history(data)
+            if frame is not None:
+                histories[chunk[0]] = frame
+
+    logger.info(f"Bulk history retrieved for {len(histories)} of {len(symbols)} tickers")
+    return histories
+
+
+# Timing span for one dataset of a scrape. fetch_s includes time spent
+# waiting for a host slot, rate limiter tokens and retry backoff. outcome is
+# 'ok', 'unchanged' (not rewritten), 'empty', 'failed' or 'skipped' (resumed
+# from an earlier run).
+class SectionSpan:
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.outcome = None
+        self.fetch_s = None
+        self.save_s = None
+        self.rows_received = None
+        self.rows_written = None
+        self.retries = 0
+        self.error = None
+
+    @property
+    def wall_s(self):
+        return (self.fetch_s or 0.0) + (self.save_s or 0.0)
+
+    def to_dict(self):
+        return {
+            'dataset': self.dataset,
+            'outcome': self.outcome,
+            'wall_s': round(self.wall_s, 4),
+            'fetch_s': None if self.fetch_s is None else round(self.fetch_s, 4),
+            'save_s': None if self.save_s is None else round(self.save_s, 4),
+            'rows_received': self.rows_received,
+            'rows_written': self.rows_written,
+            'retries': self.retries,
+            'error': self.error,
+        }
+
+
+RUN_REPORT_FILENAME = "run_report.json"
+
+
+# Structured report of one get_stock_data run: a span per dataset plus the
+# run's overall wall time. Written as run_report.json next to the summary
+# report; run_batch aggregates them across tickers.
+class RunReport:
+    def __init__(self, ticker_symbol):
+        self.symbol = ticker_symbol
+        self.started_at = datetime.now(timezone.utc)
+        self.success = None
+        self.wall_s = None
+        self.spans = OrderedDict()
+        self._start = time.monotonic()
+
+    def span(self, dataset):
+        if dataset not in self.spans:
+            self.spans[dataset] = SectionSpan(dataset)
+        return self.spans[dataset]
+
+    def finish(self, success):
+        self.success = success
+        self.wall_s = time.monotonic() - self._start
+
+    def to_dict(self):
+        return {
+            'symbol': self.symbol,
+            'started_at': self.started_at.isoformat(),
+            'success': self.success,
+            'wall_s': None if self.wall_s is None else round(self.wall_s, 4),
+            'sections': [span.to_dict() for span in self.spans.values()],
+        }
+
+
+def _rows(data):
+    if isinstance(data, HistoryUpdate):
+        return 0 if data.frame is None else len(data.frame)
+    return len(data)
+
+
+# Get stock data function
+def get_stock_data(ticker_symbol, ticker_name, retry_count=3, delay=2, logger=None, max_workers=1,
+                   prefetched=None, incremental=False, cache=None, resume=False, storage=None, progress=None,
+                   dataset_keys=None, report=None, fsync=False):
+    # Without a logger the run gets its own buffer handler, detached when the
+    # scrape returns
+    scope = ExitStack()
+    if logger is None:
+        logger, _ = scope.enter_context(logging_scope(ticker_name))
+    # Per-dataset timing spans; callers pass their own report to aggregate runs
+    if report is None:
+        report = RunReport(ticker_symbol)
+    # Optionally restrict the scrape to some datasets (DatasetSection keys)
+    sections = [s for s in DATASET_SECTIONS if dataset_keys is None or s.key in dataset_keys]
+    if progress is not None:
+        progress.expect(len(sections))
+
+    logger.info(f"Fetching data for {ticker_name} ({ticker_symbol})")
+    successful_files = 0
+    generated_files = []
+    summary_report_path = None
+
+    try:
+        storage = get_storage(storage)
+        manifest = load_manifest(output_directory_name(ticker_symbol))
+        datasets = manifest['datasets']
+        completed = []
+        if resume:
+            completed = [s for s in sections
+                         if _is_complete(datasets.get(s.key), output_directory_name(ticker_symbol),
+                                         DATASET_TTLS.get(s.key, DEFAULT_TTL))]
+            sections = [s for s in sections if s not in completed]
+            logger.info(f"Resuming: {len(completed)} datasets already complete, {len(sections)} to fetch")
+
+        ticker = None
+        if sections:
+            # Create Ticker object; every endpoint read (including this
+            # validation) is retried with backoff starting at `delay` seconds
+            retry_policy = RetryPolicy(max_attempts=retry_count, base_delay=delay)
+            ticker = TickerClient(yf.Ticker(ticker_symbol), cache=cache, retry_policy=retry_policy, logger=logger)
+        # A partial refresh of a ticker that was already scraped successfully
+        # skips validation rather than spend an info request on it
+        known_good = dataset_keys is not None and any(e.get('status') == 'ok' for e in datasets.values())
+        if sections and not (known_good and 'info' not in dataset_keys):
+            try:
+                # Quick validation to check if the ticker is valid. The info
+                # response is memoized by the client and reused for step 1.
+                _ = ticker.info.get('shortName', None)
+                logger.info(f"Successfully created Ticker object for {ticker_symbol}")
+            except Exception as e:
+                logger.error(f"Failed to create Ticker object for {ticker_symbol}: {str(e)}")
+                span = report.span('info')
+                span.outcome, span.error, span.retries = 'failed', str(e), ticker.retries.get('info', 0)
+                report.finish(False)
+                return False, [], None
+
+        output_dir = create_output_directory(ticker_symbol)
+        manifest['symbol'] = ticker_symbol
+        # Directory syncs are batched until the run is written
+        fsync_batch = FsyncBatch() if fsync else False
+
+        for section in completed:
+            entry = datasets[section.key]
+            logger.info(f"Skipping {section.label}: completed at {entry['fetched_at']}")
+            report.span(section.key).outcome = 'skipped'
+            if progress is not None:
+                progress.update(ticker_symbol, section.key, 'skipped')
+            if entry['status'] == 'ok':
+                successful_files += 1
+                filepath = os.path.join(output_dir, entry['file'])
+                if filepath not in generated_files:
+                    generated_files.append(filepath)
+
+        if incremental and storage.extension != '.csv':
+            logger.warning("Incremental history refresh needs CSV storage; fetching full history instead")
+        elif incremental:
+            history_path = os.path.join(output_dir, 'historical_data.csv')
+            sections = [s._replace(label='historical market data (incremental)',
+                                   loader=_incremental_history_loader(history_path, logger))
+                        if s.key == 'history' else s for s in sections]
+
+        # Transactional backends collect every dataset and write them together
+        transactional = getattr(storage, 'transactional', False)
+        pending = []
+        if transactional:
+            db_path = storage.database_path(output_dir)
+            db_entry = os.path.abspath(db_path) if storage.path else os.path.relpath(db_path, output_dir)
+
+        # Fetch all datasets, concurrently when max_workers > 1
+        for section, data, error, fetch_s in _fetch_sections(ticker, sections, logger, max_workers=max_workers,
+                                                             prefetched=prefetched):
+            filename = db_entry if transactional else dataset_filename(section.filename, storage)
+            span = report.span(section.key)
+            span.fetch_s = fetch_s
+            span.retries = ticker.retries.get(section.key, 0)
+            if data is None:
+                span.outcome, span.error = ('failed' if error else 'empty'), error
+                datasets[section.key] = _manifest_entry(filename, 'failed' if error else 'empty', error=error)
+                save_manifest(manifest, output_dir, logger)
+                if progress is not None:
+                    progress.update(ticker_symbol, section.key, 'failed' if error else 'empty')
+                continue
+
+            span.rows_received = _rows(data)
+            content_hash = None if isinstance(data, HistoryUpdate) else _frame_hash(data)
+            if content_hash is not None and _is_unchanged(datasets.get(section.key), filename, content_hash,
+                                                          output_dir):
+                logger.info(f"Skipping save for {filename}: {section.label} unchanged since last fetch")
+                successful_files += 1
+                filepath = os.path.join(output_dir, filename)
+                if filepath not in generated_files:
+                    generated_files.append(filepath)
+                datasets[section.key] = _manifest_entry(filename, 'ok', rows=len(data), content_hash=content_hash)
+                span.outcome, span.rows_written = 'unchanged', 0
+                files_unchanged.inc(section.key)
+                save_manifest(manifest, output_dir, logger)
+                if progress is not None:
+                    progress.update(ticker_symbol, section.key, 'unchanged')
+                continue
+
+            if transactional:
+                pending.append((section, data, content_hash))
+                if progress is not None:
+                    progress.update(ticker_symbol, section.key, 'fetched')
+                continue
+            save_start = time.monotonic()
+            if isinstance(data, HistoryUpdate):
+                saved = append_history(data, section.filename, output_dir, logger, fsync=fsync_batch)
+                previous_rows = (datasets.get(section.key) or {}).get('rows')
+                rows = previous_rows
+                if previous_rows is not None and data.frame is not None and not data.frame.empty:
+                    rows = previous_rows - 1 + len(data.frame)
+            elif section.key == 'news':
+                saved = save_news(data, section.filename, output_dir, logger, storage=storage, fsync=fsync_batch)
+                rows = len(data)
+            else:
+                saved = save_data(data, section.filename, output_dir, logger, storage=storage, fsync=fsync_batch)
+                rows = len(data)
+
+            span.save_s = time.monotonic() - save_start
+
+            if saved:
+                successful_files += 1
+                generated_files.append(os.path.join(output_dir, filename))
+                datasets[section.key] = _manifest_entry(filename, 'ok', rows=rows, content_hash=content_hash)
+                span.outcome, span.rows_written = 'ok', span.rows_received
+            else:
+                datasets[section.key] = _manifest_entry(filename, 'failed', error="Save failed")
+                span.outcome, span.error = 'failed', "Save failed"
+            save_manifest(manifest, output_dir, logger)
+            if progress is not None:
+                progress.update(ticker_symbol, section.key, 'ok' if saved else 'failed')
+
+        if pending:
+            save_start = time.monotonic()
+            try:
+                # The manifest keeps the hash of the fetched news, not of the
+                # merged store, so the next fetch can be compared against it
+                tables = [(section, _merge_news(_stored_sqlite_news(storage, db_path, ticker_symbol), data))
+                          if section.key == 'news' else (section, data) for section, data, _ in pending]
+                storage.write_all(db_path, ticker_symbol,
+                                  [(os.path.splitext(section.filename)[0], data) for section, data in tables])
+                logger.info(f"Saved {len(pending)} datasets to {db_path} in one transaction")
+                successful_files += len(pending)
+                if db_path not in generated_files:
+                    generated_files.append(db_path)
+                for section, data, content_hash in pending:
+                    datasets[section.key] = _manifest_entry(db_entry, 'ok', rows=len(data),
+                                                            content_hash=content_hash)
+                    span = report.span(section.key)
+                    span.outcome, span.rows_written = 'ok', len(data)
+            except Exception as e:
+                logger.error(f"Failed to save datasets to {db_path}: {str(e)}")
+                for section, _, _ in pending:
+                    datasets[section.key] = _manifest_entry(db_entry, 'failed', error=str(e))
+                    span = report.span(section.key)
+                    span.outcome, span.error = 'failed', str(e)
+            # The transaction is shared, so its time is split evenly between
+            # the datasets it wrote
+            save_s = (time.monotonic() - save_start) / len(pending)
+            for section, _, _ in pending:
+                report.span(section.key).save_s = save_s
+            save_manifest(manifest, output_dir, logger)
 
         # Create a summary report
         summary = f"""
@@ -329,16 +1781,28 @@ def get_stock_data(ticker_symbol, ticker_name, retry_count=3, delay=2, logger=No
         """
 
         filename = "summary_report.txt"
-        save_data(summary, filename, output_dir, logger)
+        save_data(summary, filename, output_dir, logger, fsync=fsync_batch)
         summary_report_path = os.path.join(output_dir, filename)
         generated_files.append(summary_report_path)
         logger.info("Created summary report")
+        if cache is not None:
+            logger.info(f"Response cache: {cache.summary()}")
+
+        report.finish(successful_files > 0)
+        save_data(json.dumps(report.to_dict(), indent=2), RUN_REPORT_FILENAME, output_dir, logger, fsync=fsync_batch)
+        if fsync_batch:
+            save_manifest(manifest, output_dir, logger, fsync=True)
+            fsync_batch.add(output_dir)
+            fsync_batch.flush()
 
         return successful_files > 0, generated_files, summary_report_path
 
     except Exception as e:
         logger.error(f"Error occurred while scraping data: {str(e)}")
+        report.finish(False)
         return False, [], None
+    finally:
+        scope.close()
 
 
 # Function to generate tickers for Indian exchanges
@@ -349,19 +1813,296 @@ def get_indian_tickers(base_ticker):
     return tickers
 
 
-# Function to download CSV
-def get_csv_download_link(df, filename):
-    csv = df.to_csv(index=True)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="{filename}">Download CSV</a>'
-    return href
+# Ticker symbols for a list of names: names with an exchange suffix are kept,
+# bare names expand through get_indian_tickers. Duplicates are dropped.
+def expand_tickers(names):
+    symbols = []
+    for name in names:
+        for symbol in ([name] if '.' in name else get_indian_tickers(name)):
+            if symbol not in symbols:
+                symbols.append(symbol)
+    return symbols
+
+
+# Read a watchlist file: one ticker per line (commas also accepted),
+# blank lines and '#' comments ignored
+def load_watchlist(path):
+    tickers = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            tickers.extend(t.strip() for t in line.split(',') if t.strip())
+    return tickers
 
 
-# Function to run the scraper in a separate thread
-def run_scraper(ticker_name, retry_count, delay):
-    with st.spinner(f"Fetching data for {ticker_name}. This may take a few minutes..."):
-        # Set up logging
-        logger, log_handler = setup_logging(ticker_name)
+# Collects warning and error messages logged while scraping a single ticker
+class _ErrorCollector(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+BATCH_RESULT_COLUMNS = ['ticker', 'success', 'files', 'elapsed_s', 'errors']
+
+
+# Aggregate per-ticker run reports into per-dataset totals, slowest dataset
+# (by total fetch time) first, so the endpoint dominating a run stands out
+def aggregate_run_reports(reports):
+    datasets = {}
+    for report in reports:
+        for span in report.spans.values():
+            totals = datasets.setdefault(span.dataset, {
+                'dataset': span.dataset, 'tickers': 0, 'ok': 0, 'unchanged': 0, 'empty': 0, 'failed': 0, 'skipped': 0,
+                'fetch_s': 0.0, 'max_fetch_s': 0.0, 'save_s': 0.0, 'rows_received': 0, 'rows_written': 0,
+                'retries': 0})
+            totals['tickers'] += 1
+            if span.outcome in ('ok', 'unchanged', 'empty', 'failed', 'skipped'):
+                totals[span.outcome] += 1
+            totals['fetch_s'] += span.fetch_s or 0.0
+            totals['max_fetch_s'] = max(totals['max_fetch_s'], span.fetch_s or 0.0)
+            totals['save_s'] += span.save_s or 0.0
+            totals['rows_received'] += span.rows_received or 0
+            totals['rows_written'] += span.rows_written or 0
+            totals['retries'] += span.retries
+
+    rows = sorted(datasets.values(), key=lambda t: t['fetch_s'], reverse=True)
+    for totals in rows:
+        fetched = totals['tickers'] - totals['skipped']
+        totals['mean_fetch_s'] = round(totals['fetch_s'] / fetched, 4) if fetched else None
+        for key in ('fetch_s', 'max_fetch_s', 'save_s'):
+            totals[key] = round(totals[key], 4)
+    return {
+        'tickers': len(reports),
+        'succeeded': sum(1 for r in reports if r.success),
+        'datasets': rows,
+        'runs': [r.to_dict() for r in reports],
+    }
+
+
+# Scrape many tickers through a shared worker pool. `tickers` is a list of
+# symbols or the path of a watchlist file; bare names are expanded through
+# get_indian_tickers. Returns one result row per ticker symbol.
+def run_batch(tickers, retry_count=3, delay=2, max_workers=4, section_workers=1, host_concurrency=8,
+              logger=None, bulk_history=True, history_chunk_size=50, cache=None, rate=None, burst=None,
+              resume=False, storage=None, progress=None, incremental=False, report_path=None, fsync=False):
+    # Without a logger the batch gets its own buffer handler, detached when it
+    # returns
+    with ExitStack() as scope:
+        if isinstance(tickers, str):
+            tickers = load_watchlist(tickers)
+        if logger is None:
+            logger, _ = scope.enter_context(logging_scope("batch"))
+
+        symbols = expand_tickers(tickers)
+
+        set_host_concurrency(host_concurrency)
+        configure_rate_limit(rate=rate, burst=burst)
+        logger.info(f"Starting batch of {len(symbols)} tickers with {max_workers} workers")
+        batch_start = time.monotonic()
+
+        histories = {}
+        bulk_history_s = 0.0
+        # Incremental refreshes only request recent bars, so skip the bulk download
+        if bulk_history and not incremental:
+            stale = [s for s in symbols
+                     if not (resume and _is_complete(load_manifest(output_directory_name(s))['datasets'].get('history'),
+                                                     output_directory_name(s), DATASET_TTLS['history']))]
+            if stale:
+                histories = download_history(stale, chunk_size=history_chunk_size, logger=logger)
+                bulk_history_s = time.monotonic() - batch_start
+
+        def scrape(symbol):
+            ticker_logger = logger.getChild(symbol.replace('.', '_'))
+            collector = _ErrorCollector()
+            ticker_logger.addHandler(collector)
+            start = time.monotonic()
+            report = reports[symbol] = RunReport(symbol)
+            try:
+                prefetched = {'history': histories[symbol]} if symbol in histories else None
+                success, files, _ = get_stock_data(symbol, symbol, retry_count=retry_count, delay=delay,
+                                                   logger=ticker_logger, max_workers=section_workers,
+                                                   prefetched=prefetched, cache=cache, resume=resume,
+                                                   storage=storage, progress=progress, incremental=incremental,
+                                                   report=report, fsync=fsync)
+            except Exception as e:
+                logger.error(f"Unhandled error while scraping {symbol}: {str(e)}")
+                success, files = False, []
+                collector.messages.append(str(e))
+            finally:
+                ticker_logger.removeHandler(collector)
+            return {
+                'ticker': symbol,
+                'success': success,
+                'files': len(files),
+                'elapsed_s': round(time.monotonic() - start, 3),
+                'errors': "; ".join(collector.messages),
+            }
+
+        reports = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            rows = list(executor.map(scrape, symbols))
+
+        results = pd.DataFrame(rows, columns=BATCH_RESULT_COLUMNS)
+        logger.info(f"Batch complete: {int(results['success'].sum())} of {len(results)} tickers succeeded")
+
+        summary = aggregate_run_reports([reports[s] for s in symbols])
+        summary['wall_s'] = round(time.monotonic() - batch_start, 4)
+        summary['bulk_history_s'] = round(bulk_history_s, 4)
+        slowest = ", ".join(f"{t['dataset']} {t['fetch_s']:.1f}s" for t in summary['datasets'][:3])
+        if slowest:
+            logger.info(f"Slowest datasets by total fetch time: {slowest}")
+        if report_path:
+            save_data(json.dumps(summary, indent=2), os.path.basename(report_path),
+                      os.path.dirname(report_path) or ".", logger)
+        return results
+
+
+# Memoizes values loaded from files (parsed DataFrames, raw bytes) keyed on
+# path, mtime and size, so a file is only re-read after it changes. Entries
+# are evicted least recently used first once max_bytes is exceeded.
+class FileCache:
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, kind, path, loader, sizeof):
+        stat = os.stat(path)
+        key = (kind, os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+
+        value = loader(path)
+        size = sizeof(value)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self._size += size
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+        return value
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _create_viewer_cache():
+    return FileCache()
+
+
+# One cache per Streamlit server process, shared across reruns and sessions
+def get_viewer_cache():
+    import streamlit as st
+    return st.cache_resource(_create_viewer_cache)()
+
+
+def load_dataset(file_path):
+    return get_viewer_cache().get('frame', file_path, read_dataset,
+                                  lambda df: int(df.memory_usage(deep=True).sum()))
+
+
+def load_file_bytes(file_path):
+    return get_viewer_cache().get('bytes', file_path, _read_bytes, len)
+
+
+DOWNLOAD_MIME_TYPES = {
+    '.csv': 'text/csv',
+    '.parquet': 'application/vnd.apache.parquet',
+    '.sqlite': 'application/vnd.sqlite3',
+}
+
+
+# Download button serving the file's bytes as stored on disk. Nothing is
+# parsed or re-encoded; Streamlit serves the bytes from its media endpoint
+# instead of inlining them into the page. Streamlit reads and stores the data
+# as soon as the button renders, so only render it for a file the user picked.
+def file_download_button(file_path):
+    import streamlit as st
+
+    file_name = os.path.basename(file_path)
+    mime = DOWNLOAD_MIME_TYPES.get(os.path.splitext(file_name)[1], 'application/octet-stream')
+    st.download_button("Download", data=load_file_bytes(file_path), file_name=file_name, mime=mime,
+                       key=f"download_{file_path}")
+
+
+# Progress of a running scrape, shared between the worker thread that
+# updates it and the Streamlit session that polls it
+class ScrapeProgress:
+    def __init__(self):
+        self.total = 0
+        self.events = []
+        self.started_at = time.time()
+        self.finished_at = None
+        self.log_handler = None
+        self._lock = threading.Lock()
+
+    def expect(self, count):
+        with self._lock:
+            self.total += count
+
+    def update(self, ticker_symbol, dataset, status):
+        with self._lock:
+            self.events.append((ticker_symbol, dataset, status))
+
+    def finish(self):
+        with self._lock:
+            self.finished_at = time.time()
+
+    # Returns (completed, total, elapsed seconds, events)
+    def snapshot(self):
+        with self._lock:
+            end = self.finished_at or time.time()
+            return len(self.events), self.total, end - self.started_at, list(self.events)
+
+
+# Runs a scrape function on a daemon thread. The function must accept a
+# `progress` keyword; its return value (or exception) is kept on the job.
+class ScrapeJob:
+    def __init__(self, target, *args, **kwargs):
+        self.progress = ScrapeProgress()
+        self.result = None
+        self.error = None
+        self._target = target
+        self._args = args
+        self._kwargs = kwargs
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self._target(*self._args, progress=self.progress, **self._kwargs)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.progress.finish()
+
+    @property
+    def done(self):
+        return not self._thread.is_alive() and self.progress.finished_at is not None
+
+
+# Scrape every exchange ticker for a company name. Safe to run off the
+# Streamlit script thread.
+def scrape_company(ticker_name, retry_count, delay, max_workers=1, use_cache=False, rate=None, storage=None,
+                   progress=None):
+    # Set up logging; the run gets its own handler, detached when it ends
+    with logging_scope(ticker_name) as (logger, log_handler):
+        if progress is not None:
+            progress.log_handler = log_handler
+        cache = ResponseCache() if use_cache else None
+        configure_rate_limit(rate=rate)
 
         base_ticker = ticker_name.replace(" ", "")
         tickers = get_indian_tickers(base_ticker)
@@ -375,7 +2116,8 @@ def run_scraper(ticker_name, retry_count, delay):
         for ticker in tickers:
             logger.info(f"Attempting to scrape data for ticker: {ticker}")
             result, files, summary_path = get_stock_data(ticker, ticker_name, retry_count=retry_count, delay=delay,
-                                                         logger=logger)
+                                                         logger=logger, max_workers=max_workers, cache=cache,
+                                                         storage=storage, progress=progress)
             results[ticker] = result
 
             if result:
@@ -387,12 +2129,8 @@ def run_scraper(ticker_name, retry_count, delay):
             else:
                 logger.warning(f"Failed to scrape complete data using ticker: {ticker}")
 
-            # Add a delay between requests to avoid rate limiting
-            if ticker != tickers[-1]:
-                time.sleep(delay)
-
         # Get log output
-        log_stream = log_handler.stream.getvalue()
+        log_stream = log_handler.getvalue()
 
         # Summary of all attempts
         success_count = len(successful_tickers)
@@ -406,8 +2144,49 @@ def run_scraper(ticker_name, retry_count, delay):
             return True, generated_files, summary_report_path, log_stream
 
 
+# Run the scraper synchronously behind a spinner
+def run_scraper(ticker_name, retry_count, delay, max_workers=1, use_cache=False, rate=None, storage=None):
+    import streamlit as st
+
+    with st.spinner(f"Fetching data for {ticker_name}. This may take a few minutes..."):
+        return scrape_company(ticker_name, retry_count, delay, max_workers=max_workers, use_cache=use_cache,
+                              rate=rate, storage=storage)
+
+
+# Show live progress and log lines of a background job and poll until it
+# finishes. Log lines are read incrementally with a cursor kept in session
+# state; at most max_log_lines are kept for display.
+def show_job_progress(job, poll_interval=0.5, max_log_lines=1000):
+    import streamlit as st
+
+    completed, total, elapsed, events = job.progress.snapshot()
+    fraction = min(completed / total, 1.0) if total else 0.0
+    st.progress(fraction, text=f"{completed}/{total} datasets complete")
+    st.caption(f"Elapsed: {elapsed:.1f}s")
+    if events:
+        st.text("\n".join(f"{symbol}: {dataset} ({status})" for symbol, dataset, status in events[-15:]))
+
+    if job.progress.log_handler is not None:
+        lines, st.session_state.log_cursor = job.progress.log_handler.read(st.session_state.get('log_cursor', 0))
+        live_log = (st.session_state.get('live_log', []) + lines)[-max_log_lines:]
+        st.session_state.live_log = live_log
+        with st.expander("Live Log", expanded=True):
+            st.code("\n".join(live_log[-200:]), language=None)
+    time.sleep(poll_interval)
+    st.rerun()
+
+
 # Main Streamlit app
 def main():
+    import streamlit as st
+
+    # Set page configuration
+    st.set_page_config(
+        page_title="Stock Data Scraper",
+        page_icon="📊",
+        layout="wide"
+    )
+
     st.title("📊 Stock Data Scraper")
     st.markdown("Enter a company name to fetch and analyze stock data from Indian exchanges.")
 
@@ -418,7 +2197,11 @@ def main():
             ticker_name = st.text_input("Enter company's ticker name (e.g., TCS, INFY, RELIANCE):")
         with col2:
             retry_count = st.number_input("Retry count:", min_value=1, max_value=5, value=3)
-            delay = st.number_input("Delay between requests (seconds):", min_value=1, max_value=10, value=5)
+            delay = st.number_input("Retry delay (seconds):", min_value=1, max_value=10, value=2)
+            rate = st.number_input("Requests per second:", min_value=0.5, max_value=20.0, value=2.0, step=0.5)
+            max_workers = st.number_input("Parallel requests:", min_value=1, max_value=16, value=4)
+            use_cache = st.checkbox("Use cached responses", value=True)
+            storage = st.selectbox("Storage format:", list(STORAGE_BACKENDS))
 
         submitted = st.form_submit_button("Fetch Data")
 
@@ -430,7 +2213,21 @@ def main():
             st.session_state.completed = False
 
             # Run the scraper in a separate thread
-            success, generated_files, summary_report_path, log_output = run_scraper(ticker_name, retry_count, delay)
+            st.session_state.job = ScrapeJob(scrape_company, ticker_name, retry_count, delay,
+                                             max_workers=max_workers, use_cache=use_cache, rate=rate,
+                                             storage=storage).start()
+
+    # Poll the background job until it finishes
+    if st.session_state.get('processing') and 'job' in st.session_state:
+        job = st.session_state.job
+        if not job.done:
+            st.info(f"Fetching data for {ticker_name}...")
+            show_job_progress(job)
+        else:
+            if job.error is not None:
+                success, generated_files, summary_report_path, log_output = False, [], None, str(job.error)
+            else:
+                success, generated_files, summary_report_path, log_output = job.result
 
             # Update session state with results
             st.session_state.processing = False
@@ -484,20 +2281,22 @@ def main():
                             col1, col2 = st.columns([3, 1])
 
                             with col1:
-                                if file_name.endswith('.csv'):
+                                if is_dataset_file(file_name):
                                     if st.button(f"📄 {file_name}", key=f"view_{file_path}"):
                                         st.session_state.selected_file = file_path
                                 else:
                                     if st.button(f"📝 {file_name}", key=f"view_{file_path}"):
                                         st.session_state.selected_file = file_path
 
+                            # Only the selected file gets a download button, so
+                            # a rerun never loads the bytes of every file
                             with col2:
-                                if file_name.endswith('.csv'):
+                                if (file_path == st.session_state.get('selected_file')
+                                        and os.path.splitext(file_name)[1] in DOWNLOAD_MIME_TYPES):
                                     try:
-                                        df = pd.read_csv(file_path)
-                                        st.markdown(get_csv_download_link(df, file_name), unsafe_allow_html=True)
+                                        file_download_button(file_path)
                                     except Exception as e:
-                                        st.error(f"Error reading CSV: {str(e)}")
+                                        st.error(f"Error reading file: {str(e)}")
 
                 # Display selected file content
                 if 'selected_file' in st.session_state:
@@ -506,12 +2305,19 @@ def main():
 
                     st.subheader(f"Viewing: {file_name}")
 
-                    if file_name.endswith('.csv'):
+                    if is_dataset_file(file_name):
                         try:
-                            df = pd.read_csv(file_path)
+                            df = load_dataset(file_path)
                             st.dataframe(df, use_container_width=True)
                         except Exception as e:
                             st.error(f"Error reading CSV: {str(e)}")
+                    elif file_name.endswith(SqliteStorage.extension):
+                        try:
+                            table = st.selectbox("Table", SqliteStorage.list_tables(file_path))
+                            if table:
+                                st.dataframe(SqliteStorage().read_table(file_path, table), use_container_width=True)
+                        except Exception as e:
+                            st.error(f"Error reading database: {str(e)}")
                     else:
                         try:
                             with open(file_path, 'r') as f:
@@ -533,7 +2339,7 @@ def main():
         # Reset button
         if st.button("Start New Search"):
             for key in ['processing', 'completed', 'success', 'generated_files', 'summary_report_path', 'log_output',
-                        'selected_file']:
+                        'selected_file', 'job', 'log_cursor', 'live_log']:
                 if key in st.session_state:
                     del st.session_state[key]
             st.rerun()  # Updated from experimental_rerun()